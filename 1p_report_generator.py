@@ -4,11 +4,47 @@
 Generates HTML stability report for 1P test cases from cx_dashboard database
 """
 
-import pymysql
 import sys
-from datetime import datetime
+import argparse
+import gzip
+import hashlib
+import json
+import pickle
+import platform
+import queue
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, datetime, timedelta
 import os
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from heapq import nlargest
+from itertools import compress, repeat
+from operator import and_, attrgetter, eq, gt, lt, ne
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 # Database configuration
 DB_CONFIG = {
@@ -17,85 +53,1026 @@ DB_CONFIG = {
     'password': 'root',  # Replace with your database password
     'database': 'cx_dashboard',
     'charset': 'utf8mb4',
-    'cursorclass': pymysql.cursors.DictCursor
+    'cursorclass': pymysql.cursors.DictCursor if pymysql else None
 }
 
-def get_db_connection():
+class MySQLBackend:
+    """The cx_dashboard database on MySQL, through pymysql"""
+
+    name = 'mysql'
+
+    def __init__(self, config=None):
+        self.config = config or DB_CONFIG
+
+    def connect(self):
+        """Open a new connection"""
+        if pymysql is None:
+            raise RuntimeError("the mysql backend needs the pymysql package")
+        return pymysql.connect(**self.config)
+
+class SQLiteCursor:
+    """DB-API cursor over sqlite3 that takes pymysql-style %s parameters and returns dict rows"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @staticmethod
+    def _translate(query):
+        return re.sub(r'%([s%])', lambda match: '?' if match.group(1) == 's' else '%', query)
+
+    def execute(self, query, params=None):
+        if params is None:
+            return self._cursor.execute(query)
+        return self._cursor.execute(self._translate(query), tuple(params))
+
+    def executemany(self, query, seq_of_params):
+        return self._cursor.executemany(self._translate(query), seq_of_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SQLiteConnection:
+    """sqlite3 connection that behaves like a pymysql DictCursor connection"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = lambda cursor, row: {
+            column[0]: value for column, value in zip(cursor.description, row)
+        }
+        # MySQL's CRC32, which the data fingerprint checksums are built from
+        self._connection.create_function(
+            'CRC32', 1, lambda value: None if value is None else zlib.crc32(str(value).encode('utf-8')),
+            deterministic=True
+        )
+
+    def cursor(self, tuple_rows=False):
+        cursor = self._connection.cursor()
+        if tuple_rows:
+            # Plain tuples, like pymysql's SSCursor
+            cursor.row_factory = None
+        return SQLiteCursor(cursor)
+
+    def executescript(self, script):
+        self._connection.executescript(script)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+# Schema of the cx_dashboard tables the report reads and writes, for the SQLite backend
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tc_test_run (
+    id INTEGER PRIMARY KEY,
+    test_plan_id INT NOT NULL,
+    test_case_key VARCHAR(255) NOT NULL,
+    owner VARCHAR(255),
+    feature VARCHAR(255),
+    test_case_status VARCHAR(64),
+    created_at DATETIME
+);
+CREATE TABLE IF NOT EXISTS tc_case_epic (
+    test_case_id VARCHAR(255) NOT NULL,
+    epic_id VARCHAR(64) NOT NULL,
+    epic_title VARCHAR(255)
+);
+CREATE INDEX IF NOT EXISTS idx_tc_case_epic_test_case ON tc_case_epic (test_case_id);
+CREATE TABLE IF NOT EXISTS test_run_trend (
+    id INTEGER PRIMARY KEY,
+    test_plan_id INT NOT NULL,
+    passed INT,
+    failed INT,
+    blocked INT,
+    application_bug INT,
+    not_implemented INT,
+    run_date DATE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_test_run_trend_plan_date ON test_run_trend (test_plan_id, run_date);
+"""
+
+class SQLiteBackend:
+    """A local SQLite file with the cx_dashboard schema, for offline runs and benchmarks"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        """Open a new connection, creating the schema if the file is new"""
+        connection = SQLiteConnection(self.path)
+        connection.executescript(SQLITE_SCHEMA)
+        return connection
+
+DATABASE_BACKENDS = ('mysql', 'sqlite')
+DEFAULT_SQLITE_PATH = 'cx_dashboard.db'
+
+# Store datetimes the way MySQL prints them
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+def get_backend(name='mysql', sqlite_path=DEFAULT_SQLITE_PATH):
+    """Get the database backend selected on the command line"""
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path)
+    return MySQLBackend()
+
+def get_db_connection(backend=None):
     """Create and return database connection"""
     try:
-        connection = pymysql.connect(**DB_CONFIG)
+        connection = (backend or MySQLBackend()).connect()
         return connection
     except Exception as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
-def execute_query(connection, query):
-    """Execute query and return results"""
+def get_dialect(connection):
+    """Get the SQL dialect spoken by a connection: 'sqlite' or 'mysql'"""
+    return getattr(connection, 'dialect', 'mysql')
+
+def get_upsert_clause(connection, key_columns):
+    """Get the clause that turns an INSERT into an update of the row with the same key"""
+    if get_dialect(connection) == 'sqlite':
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET"
+    return "ON DUPLICATE KEY UPDATE"
+
+def get_inserted_value(connection, column):
+    """Reference the value an upsert tried to insert into a column"""
+    if get_dialect(connection) == 'sqlite':
+        return f"excluded.{column}"
+    return f"VALUES({column})"
+
+def get_greatest(connection, *expressions):
+    """Get the larger of several SQL expressions"""
+    function = 'MAX' if get_dialect(connection) == 'sqlite' else 'GREATEST'
+    return f"{function}({', '.join(expressions)})"
+
+def get_checksum(connection, *columns):
+    """Get an order-independent checksum of the columns over the selected rows
+
+    Sums the CRC32 of each row's columns, so an in-place update of any of
+    them changes it as well as an insert or delete does.
+    """
+    values = [f"COALESCE({column}, '')" for column in columns]
+    if get_dialect(connection) == 'sqlite':
+        row = " || '|' || ".join(values)
+    else:
+        row = f"CONCAT_WS('|', {', '.join(values)})"
+    return f"COALESCE(SUM(CRC32({row})), 0)"
+
+class Profiler:
+    """Collects wall times, query row counts and byte counts for one run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = defaultdict(float)
+        self.queries = []
+        self.sections = defaultdict(lambda: {'seconds': 0.0, 'chunks': 0, 'chars': 0})
+        self.bytes_written = 0
+        self.current_section = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a pipeline stage; repeated stages add up"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] += elapsed
+
+    def record_query(self, name, seconds, rows):
+        with self._lock:
+            self.queries.append({'name': name, 'seconds': seconds, 'rows': rows})
+
+    def record_write(self, write_stats):
+        """Count the plain and compressed bytes of a written report"""
+        with self._lock:
+            self.bytes_written += write_stats['raw_bytes']
+            self.bytes_written += sum(output['bytes'] for output in write_stats['compressed'])
+
+    def iter_sections(self, chunks):
+        """Time report rendering per section, excluding the time spent writing chunks"""
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            section = self.sections[self.current_section or 'setup']
+            section['seconds'] += time.perf_counter() - start
+            section['chunks'] += 1
+            section['chars'] += len(chunk)
+            yield chunk
+
+    def get_query_totals(self):
+        """Aggregate query timings by query name"""
+        totals = {}
+        for query in self.queries:
+            total = totals.setdefault(query['name'], {'calls': 0, 'rows': 0, 'seconds': 0.0})
+            total['calls'] += 1
+            total['rows'] += query['rows']
+            total['seconds'] += query['seconds']
+        return totals
+
+    def to_dict(self):
+        return {
+            'total_seconds': time.perf_counter() - self.started,
+            'peak_rss_bytes': get_peak_rss(),
+            'bytes_written': self.bytes_written,
+            'stages': dict(self.stages),
+            'queries': self.queries,
+            'query_totals': self.get_query_totals(),
+            'sections': {name: dict(section) for name, section in self.sections.items()}
+        }
+
+    def format_table(self):
+        profile = self.to_dict()
+        lines = [f"\n{'='*60}", "Profile", f"{'-'*60}", f"{'Stage':<40} {'ms':>19}"]
+        for name, seconds in profile['stages'].items():
+            lines.append(f"{name:<40} {seconds*1000:>19.2f}")
+        lines += [f"{'-'*60}", f"{'Query':<32} {'Calls':>6} {'Rows':>9} {'ms':>10}"]
+        for name, total in profile['query_totals'].items():
+            lines.append(f"{name:<32} {total['calls']:>6} {total['rows']:>9} {total['seconds']*1000:>10.2f}")
+        if profile['sections']:
+            lines += [f"{'-'*60}", f"{'Render section':<32} {'Chunks':>6} {'Chars':>9} {'ms':>10}"]
+            for name, section in profile['sections'].items():
+                lines.append(
+                    f"{name:<32} {section['chunks']:>6} {section['chars']:>9} {section['seconds']*1000:>10.2f}"
+                )
+        lines.append(f"{'-'*60}")
+        if profile['peak_rss_bytes'] is not None:
+            lines.append(f"Peak RSS: {profile['peak_rss_bytes'] / (1024 * 1024):.1f} MB")
+        lines.append(f"Bytes written: {profile['bytes_written']}")
+        lines.append(f"Total: {profile['total_seconds']*1000:.2f} ms")
+        lines.append(f"{'='*60}\n")
+        return '\n'.join(lines)
+
+    def iter_statsd_lines(self, prefix='1p_report'):
+        """Yield StatsD lines: timers in ms, row and byte counts as gauges"""
+        profile = self.to_dict()
+        for name, seconds in profile['stages'].items():
+            yield f"{prefix}.stage.{name}:{seconds*1000:.3f}|ms"
+        for query in profile['queries']:
+            yield f"{prefix}.query.{query['name']}:{query['seconds']*1000:.3f}|ms"
+            yield f"{prefix}.query.{query['name']}.rows:{query['rows']}|g"
+        for name, section in profile['sections'].items():
+            yield f"{prefix}.render.{name}:{section['seconds']*1000:.3f}|ms"
+        if profile['peak_rss_bytes'] is not None:
+            yield f"{prefix}.peak_rss_bytes:{profile['peak_rss_bytes']}|g"
+        yield f"{prefix}.bytes_written:{profile['bytes_written']}|g"
+        yield f"{prefix}.total:{profile['total_seconds']*1000:.3f}|ms"
+
+    def format(self, fmt):
+        """Format the profile as 'table', 'json' or 'statsd'"""
+        if fmt == 'json':
+            return json.dumps(self.to_dict(), indent=2)
+        if fmt == 'statsd':
+            return '\n'.join(self.iter_statsd_lines())
+        return self.format_table()
+
+PROFILE_FORMATS = ('table', 'json', 'statsd')
+
+# Profiler of the current run; None unless --profile is given
+_profiler = None
+
+def start_profiling():
+    """Start collecting instrumentation for this run and return the profiler"""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+@contextmanager
+def profile_stage(name):
+    """Time a pipeline stage when profiling is on"""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.stage(name):
+            yield
+
+def mark_render_section(name):
+    """Attribute the rendering that follows to a report section when profiling is on"""
+    if _profiler is not None:
+        _profiler.current_section = name
+
+def get_peak_rss():
+    """Get the peak resident set size of this process in bytes, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def get_cursor(connection, tuple_rows=False):
+    """Get a dict cursor, or a tuple cursor
+
+    pymysql binds parameters on the client, which keeps the statement text
+    identical across plans.
+    """
+    if tuple_rows:
+        if get_dialect(connection) == 'sqlite':
+            return connection.cursor(tuple_rows=True)
+        return connection.cursor(pymysql.cursors.Cursor)
+    return connection.cursor()
+
+# Types numeric result fields are converted to once, when their row is read;
+# MySQL returns SUM() and ROUND() results as Decimal
+ROW_FIELD_TYPES = {
+    'count': int,
+    'total_tests': int,
+    'passed': int,
+    'failed': int,
+    'blocked': int,
+    'app_bug': int,
+    'application_bug': int,
+    'not_implemented': int,
+    'success_rate': float
+}
+
+@lru_cache(maxsize=None)
+def get_row_factory(row_type):
+    """Get a function building a named tuple row type from a tuple row, typing its numeric fields"""
+    conversions = [
+        (index, ROW_FIELD_TYPES[field]) for index, field in enumerate(row_type._fields)
+        if field in ROW_FIELD_TYPES
+    ]
+    if not conversions:
+        return row_type._make
+
+    def make_row(row):
+        values = list(row)
+        for index, convert in conversions:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        return row_type._make(values)
+    return make_row
+
+def record_query(name, start, rows):
+    """Record a query's wall time since start and its row count when profiling is on"""
+    if _profiler is not None:
+        _profiler.record_query(name, time.perf_counter() - start, rows)
+
+def execute_query(connection, query, params=None, row_type=None, name='query'):
+    """Execute a parameterized query and return results
+
+    Rows are dicts, or instances of row_type, a named tuple whose fields
+    are the selected columns in order. name is the query's label in the
+    profile.
+    """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            return cursor.fetchall()
+        start = time.perf_counter()
+        with get_cursor(connection, tuple_rows=row_type is not None) as cursor:
+            cursor.execute(query, params)
+            result = cursor.fetchall()
+        if row_type is not None:
+            result = list(map(get_row_factory(row_type), result))
+        record_query(name, start, len(result))
+        return result
     except Exception as e:
         print(f"Error executing query: {e}")
         return []
 
-def get_overall_summary(connection, test_plan_id):
-    """Get overall test summary statistics"""
-    query = f"""
-    WITH latest_runs AS (
-        SELECT 
+def execute_statement(connection, query, params=None, name='statement', many=False):
+    """Execute a write, or one per parameter set with many, and return the affected row count
+
+    Errors are raised so the caller can roll back; the caller commits.
+    name is the statement's label in the profile.
+    """
+    start = time.perf_counter()
+    with get_cursor(connection) as cursor:
+        if many:
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params)
+        row_count = cursor.rowcount
+    record_query(name, start, row_count)
+    return row_count
+
+# Rows fetched from an unbuffered cursor at a time
+STREAM_BATCH_SIZE = 1000
+
+def get_streaming_cursor(connection):
+    """Get an unbuffered cursor returning tuple rows, so a result is never held in memory whole
+
+    pymysql's SSCursor reads rows off the socket as they are fetched. The
+    connection cannot run another query until the result has been read.
+    """
+    if get_dialect(connection) == 'sqlite':
+        return connection.cursor(tuple_rows=True)
+    return connection.cursor(pymysql.cursors.SSCursor)
+
+def stream_query(connection, query, params=None, row_type=None, name='query'):
+    """Execute a parameterized query and yield its rows as they arrive
+
+    Rows are tuples, or instances of the named tuple row_type. The profile
+    records the query under name, and its time includes the time the
+    caller spends on the rows. Unlike execute_query,
+    errors are raised: rows already yielded are only part of the result,
+    and a report summarized from them must not be written.
+    """
+    start = time.perf_counter()
+    row_count = 0
+    make_row = get_row_factory(row_type) if row_type is not None else None
+    try:
+        with get_streaming_cursor(connection) as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield from map(make_row, rows) if make_row else rows
+    finally:
+        record_query(name, start, row_count)
+
+# Strategies for picking the latest run of each test case; 'materialized'
+# reads the tc_latest_1p_run table (1P scope only), which follows new runs
+# but not runs updated or deleted in place, so it is only used on request
+LATEST_RUN_STRATEGIES = ('row_number', 'max_id', 'max_created_at', 'materialized')
+DEFAULT_LATEST_RUN_STRATEGY = 'row_number'
+
+# Covering index for latest-run lookups; InnoDB appends the primary key (id)
+LATEST_RUN_INDEX_NAME = 'idx_tc_test_run_plan_case_created'
+LATEST_RUN_INDEX_COLUMNS = ('test_plan_id', 'test_case_key', 'created_at')
+
+# Feature names carry scope tags in square brackets, such as "Checkout [1P]"
+FEATURE_TAG_PATTERN = re.compile(r'\[([^\[\]]{1,64})\]')
+
+# Tag of the features of 1P test cases
+FEATURE_SCOPE_TAGS = ('1P',)
+
+# Index the scope filter finds a plan's runs of the tagged features by
+FEATURE_SCOPE_INDEX_NAME = 'idx_tc_test_run_plan_feature'
+FEATURE_SCOPE_INDEX_COLUMNS = ('test_plan_id', 'feature')
+
+# Report scopes: the feature tags a report covers (None for every feature),
+# whether its counts are the ones kept in test_run_trend, and how its page
+# and file are labelled. Any other --scope value is a custom tag set.
+REPORT_SCOPES = {
+    '1p': {
+        'tags': FEATURE_SCOPE_TAGS,
+        'trend': True,
+        'file_suffix': '1p_report',
+        'report_title': '1P Test Cases Stability Dashboard',
+        'nav_brand': '1P Test Dashboard',
+        'scope_description': '1P features',
+        'feature_heading': '1P Feature',
+        'footer_title': '1P Features Test Execution Report'
+    },
+    'complete': {
+        'tags': None,
+        'trend': False,
+        'file_suffix': 'complete_report',
+        'report_title': 'Test Cases Stability Dashboard',
+        'nav_brand': 'Test Dashboard',
+        'scope_description': 'all test cases',
+        'feature_heading': 'Feature',
+        'footer_title': 'Complete Test Plan Execution Report'
+    }
+}
+DEFAULT_REPORT_SCOPE = '1p'
+
+def get_feature_tags(feature):
+    """Get the upper-cased scope tags in a feature name"""
+    return {tag.upper() for tag in FEATURE_TAG_PATTERN.findall(feature or '')}
+
+def normalize_report_scope(scope):
+    """Normalize a --scope value to a REPORT_SCOPES name or sorted, comma separated tags
+
+    Raises ValueError when no valid tag is given.
+    """
+    if scope.lower() in REPORT_SCOPES:
+        return scope.lower()
+    tags = sorted({tag.strip().strip('[]').strip().upper() for tag in scope.split(',')} - {''})
+    if not tags or any('[' in tag or ']' in tag or len(tag) > 64 for tag in tags):
+        raise ValueError(f"Invalid report scope: {scope}")
+    scope = ','.join(tags)
+    return scope.lower() if scope.lower() in REPORT_SCOPES else scope
+
+@lru_cache(maxsize=None)
+def get_report_scope(scope):
+    """Get the REPORT_SCOPES entry of a normalized scope, building one for a custom tag set"""
+    if scope in REPORT_SCOPES:
+        return REPORT_SCOPES[scope]
+    tags = tuple(scope.split(','))
+    label = '/'.join(tags)
+    slug = re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_') or 'tagged'
+    return {
+        'tags': tags,
+        'trend': False,
+        'file_suffix': f"{slug}_report",
+        'report_title': f"{label} Test Cases Stability Dashboard",
+        'nav_brand': f"{label} Test Dashboard",
+        'scope_description': f"{label} features",
+        'feature_heading': f"{label} Feature",
+        'footer_title': f"{label} Features Test Execution Report"
+    }
+
+# Escape character of the LIKE scope filter, so tags may hold % and _
+FEATURE_SCOPE_LIKE_ESCAPE = '!'
+
+def get_scope_condition(column, tags, tag_lookup=False):
+    """Get the condition selecting rows whose feature carries one of the tags, and its parameters
+
+    With tag_lookup the tags are looked up in tc_feature_tag, so the feature
+    column is compared by equality and both sides can use their indexes;
+    the table must have been refreshed for the plans being read. Otherwise
+    the feature name is matched with LIKE '%[tag]%'.
+    """
+    if tag_lookup:
+        sql = f"""{column} IN (
+                SELECT feature
+                FROM tc_feature_tag
+                WHERE tag IN ({', '.join(['%s'] * len(tags))})
+            )"""
+        return sql, list(tags)
+    escape = FEATURE_SCOPE_LIKE_ESCAPE
+    patterns = ['%[' + re.sub(r'([%_!])', escape + r'\1', tag) + ']%' for tag in tags]
+    sql = ' OR '.join([f"{column} LIKE %s ESCAPE '{escape}'"] * len(patterns))
+    return (f"({sql})" if len(patterns) > 1 else sql), patterns
+
+def get_run_filter(test_plan_id, alias=None, tags=FEATURE_SCOPE_TAGS, tag_lookup=False):
+    """Get the WHERE conditions and parameters selecting the in-scope runs of one plan or a list of plans
+
+    tags=None selects the runs of every feature.
+    """
+    prefix = f"{alias}." if alias else ""
+    if isinstance(test_plan_id, (list, tuple)):
+        plan_ids = [int(plan_id) for plan_id in test_plan_id]
+        plan_condition = f"{prefix}test_plan_id IN ({', '.join(['%s'] * len(plan_ids))})"
+    else:
+        plan_ids = [test_plan_id]
+        plan_condition = f"{prefix}test_plan_id = %s"
+    if tags is None:
+        return plan_condition, plan_ids
+    scope_condition, tag_params = get_scope_condition(f"{prefix}feature", tags, tag_lookup)
+    sql = f"""{plan_condition}
+            AND {scope_condition}"""
+    return sql, plan_ids + tag_params
+
+def get_latest_runs_cte(test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY, tags=FEATURE_SCOPE_TAGS,
+                        tag_lookup=False):
+    """Get CTEs ending in latest_test_runs, holding exactly one latest run per test case
+
+    test_plan_id may be a list of plans; runs are ranked within each plan.
+    Returns the CTE text and its parameters.
+    """
+    run_filter, params = get_run_filter(test_plan_id, tags=tags, tag_lookup=tag_lookup)
+
+    if strategy == 'row_number':
+        # Ties on created_at are broken by the highest id
+        return f"""
+    ranked_runs AS (
+        SELECT
+            id,
+            test_plan_id,
+            test_case_key,
+            owner,
+            feature,
+            test_case_status,
+            created_at,
+            ROW_NUMBER() OVER (
+                PARTITION BY test_plan_id, test_case_key
+                ORDER BY created_at DESC, id DESC
+            ) as run_rank
+        FROM tc_test_run
+        WHERE {run_filter}
+    ),
+    latest_test_runs AS (
+        SELECT id, test_plan_id, test_case_key, owner, feature, test_case_status, created_at
+        FROM ranked_runs
+        WHERE run_rank = 1
+    )""", params
+
+    if strategy == 'materialized':
+        if tags != FEATURE_SCOPE_TAGS:
+            raise ValueError("The materialized latest runs only cover the 1P scope")
+        return f"""
+    latest_test_runs AS (
+        SELECT run_id as id, test_plan_id, test_case_key, owner, feature, test_case_status, created_at
+        FROM tc_latest_1p_run
+        WHERE {run_filter}
+    )""", params
+
+    if strategy == 'max_id':
+        latest_ids = f"""
+    latest_run_ids AS (
+        SELECT MAX(id) as latest_run_id
+        FROM tc_test_run
+        WHERE {run_filter}
+        GROUP BY test_plan_id, test_case_key
+    ),"""
+    elif strategy == 'max_created_at':
+        # Runs sharing the latest created_at collapse onto the highest id
+        joined_filter, joined_params = get_run_filter(test_plan_id, 'tr', tags, tag_lookup)
+        params = params + joined_params
+        latest_ids = f"""
+    latest_runs AS (
+        SELECT
+            test_plan_id,
             test_case_key,
             MAX(created_at) as latest_run_time
         FROM tc_test_run
-        WHERE test_plan_id = {test_plan_id}
-            AND feature LIKE '%[1P]%'
-        GROUP BY test_case_key
+        WHERE {run_filter}
+        GROUP BY test_plan_id, test_case_key
     ),
-    test_data AS (
-        SELECT 
-            tr.test_case_status,
-            tr.test_case_key
+    latest_run_ids AS (
+        SELECT MAX(tr.id) as latest_run_id
         FROM tc_test_run tr
-        INNER JOIN latest_runs lr 
-            ON tr.test_case_key = lr.test_case_key 
+        INNER JOIN latest_runs lr
+            ON tr.test_plan_id = lr.test_plan_id
+            AND tr.test_case_key = lr.test_case_key
             AND tr.created_at = lr.latest_run_time
-        WHERE tr.test_plan_id = {test_plan_id}
-            AND tr.feature LIKE '%[1P]%'
+        WHERE {joined_filter}
+        GROUP BY tr.test_plan_id, tr.test_case_key
+    ),"""
+    else:
+        raise ValueError(f"Unknown latest run strategy: {strategy}")
+
+    return f"""{latest_ids}
+    latest_test_runs AS (
+        SELECT tr.id, tr.test_plan_id, tr.test_case_key, tr.owner, tr.feature, tr.test_case_status, tr.created_at
+        FROM tc_test_run tr
+        INNER JOIN latest_run_ids li ON tr.id = li.latest_run_id
+    )""", params
+
+def get_index_columns(connection, table_name, unique_only=False):
+    """Get the ordered column list of every index on a table
+
+    unique_only leaves out indexes that do not enforce uniqueness, and on
+    SQLite partial ones, which cannot serve as an upsert's conflict target.
+    """
+    if get_dialect(connection) == 'sqlite':
+        unique_filter = 'WHERE il."unique" = 1 AND il.partial = 0' if unique_only else ''
+        query = f"""
+        SELECT il.name as index_name, ii.name as column_name
+        FROM pragma_index_list(%s) il, pragma_index_info(il.name) ii
+        {unique_filter}
+        ORDER BY il.name, ii.seqno;
+        """
+    else:
+        unique_filter = 'AND NON_UNIQUE = 0' if unique_only else ''
+        query = f"""
+        SELECT INDEX_NAME as index_name, COLUMN_NAME as column_name
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE()
+            AND TABLE_NAME = %s
+            {unique_filter}
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX;
+        """
+    indexes = defaultdict(list)
+    for row in execute_query(connection, query, (table_name,), name='get_index_columns'):
+        indexes[row['index_name']].append(row['column_name'])
+    return indexes
+
+def check_latest_run_index(connection):
+    """Return the name of an index covering latest-run lookups, or None"""
+    size = len(LATEST_RUN_INDEX_COLUMNS)
+    for index_name, columns in get_index_columns(connection, 'tc_test_run').items():
+        if tuple(columns[:size]) == LATEST_RUN_INDEX_COLUMNS:
+            return index_name
+    return None
+
+def ensure_latest_run_index(connection):
+    """Create the covering index for latest-run lookups if it is missing"""
+    index_name = check_latest_run_index(connection)
+    if index_name:
+        print(f"Latest run index already present: {index_name}")
+        return True
+
+    query = f"""
+    CREATE INDEX {LATEST_RUN_INDEX_NAME}
+    ON tc_test_run ({', '.join(LATEST_RUN_INDEX_COLUMNS)})
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+        connection.commit()
+        print(f"Created latest run index: {LATEST_RUN_INDEX_NAME}")
+        return True
+    except Exception as e:
+        print(f"Error creating latest run index: {e}")
+        return False
+
+def ensure_feature_scope_index(connection):
+    """Create the (test_plan_id, feature) index the scope filter looks runs up by if it is missing"""
+    size = len(FEATURE_SCOPE_INDEX_COLUMNS)
+    for index_name, columns in get_index_columns(connection, 'tc_test_run').items():
+        if tuple(columns[:size]) == FEATURE_SCOPE_INDEX_COLUMNS:
+            print(f"Feature scope index already present: {index_name}")
+            return True
+
+    query = f"""
+    CREATE INDEX {FEATURE_SCOPE_INDEX_NAME}
+    ON tc_test_run ({', '.join(FEATURE_SCOPE_INDEX_COLUMNS)})
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+        connection.commit()
+        print(f"Created feature scope index: {FEATURE_SCOPE_INDEX_NAME}")
+        return True
+    except Exception as e:
+        print(f"Error creating feature scope index: {e}")
+        return False
+
+def create_feature_tag_table(connection):
+    """Create the feature tag lookup table"""
+    query = """
+    CREATE TABLE IF NOT EXISTS tc_feature_tag (
+        tag VARCHAR(64) NOT NULL,
+        feature VARCHAR(255) NOT NULL,
+        PRIMARY KEY (tag, feature)
     )
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+        connection.commit()
+        print("Created feature tag table: tc_feature_tag")
+        return True
+    except Exception as e:
+        print(f"Error creating feature tag table: {e}")
+        return False
+
+def refresh_feature_tags(connection, test_plan_ids):
+    """Tag every feature of the plans in tc_feature_tag; return whether the scope filter can use it
+
+    Each distinct feature name is parsed for its tags, so the scope filter
+    is an equality lookup rather than a leading-wildcard LIKE that reads
+    every run. The features are re-read for the plans being reported, so
+    runs committed out of id order and renamed features are tagged too.
+    Returns False when the table does not exist (see --materialize) or
+    cannot be written, and the scope filter falls back to LIKE.
+    """
+    if not table_exists(connection, 'tc_feature_tag'):
+        return False
+    plan_ids = [int(plan_id) for plan_id in test_plan_ids]
+    features_query = f"""
+    SELECT DISTINCT feature
+    FROM tc_test_run
+    WHERE test_plan_id IN ({', '.join(['%s'] * len(plan_ids))});
+    """
+    tag_query = f"""
+    INSERT INTO tc_feature_tag (tag, feature)
+    VALUES (%s, %s)
+    {get_upsert_clause(connection, ('tag', 'feature'))}
+        tag = {get_inserted_value(connection, 'tag')}
+    """
+    try:
+        features = [row[0] for row in stream_query(connection, features_query, plan_ids, name='refresh_feature_tags')]
+        tag_rows = sorted((tag, feature) for feature in features for tag in get_feature_tags(feature))
+        if tag_rows:
+            execute_statement(connection, tag_query, tag_rows, name='refresh_feature_tags', many=True)
+        connection.commit()
+        print(f"Refreshed tc_feature_tag for {len(plan_ids)} plans: {len(features)} features, {len(tag_rows)} tags")
+        return True
+    except Exception as e:
+        print(f"Error refreshing feature tags, filtering features with LIKE: {e}")
+        connection.rollback()
+        return False
+
+# Unique key the trend upsert relies on: one row per plan and day
+TREND_UNIQUE_KEY_NAME = 'uq_test_run_trend_plan_date'
+TREND_UNIQUE_KEY_COLUMNS = ('test_plan_id', 'run_date')
+
+# Runs shown in the report's trend section, today's included
+DEFAULT_TREND_RUNS = 30
+
+def check_trend_unique_key(connection):
+    """Return the name of a unique key on exactly (test_plan_id, run_date) of test_run_trend, or None"""
+    for index_name, columns in get_index_columns(connection, 'test_run_trend', unique_only=True).items():
+        if tuple(columns) == TREND_UNIQUE_KEY_COLUMNS:
+            return index_name
+    return None
+
+def ensure_trend_unique_key(connection):
+    """Create the (test_plan_id, run_date) unique key on test_run_trend if it is missing
+
+    Fails while duplicate rows for a plan and day exist; remove them first.
+    """
+    index_name = check_trend_unique_key(connection)
+    if index_name:
+        print(f"Trend unique key already present: {index_name}")
+        return True
+
+    query = f"""
+    CREATE UNIQUE INDEX {TREND_UNIQUE_KEY_NAME}
+    ON test_run_trend ({', '.join(TREND_UNIQUE_KEY_COLUMNS)})
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+        connection.commit()
+        print(f"Created trend unique key: {TREND_UNIQUE_KEY_NAME}")
+        return True
+    except Exception as e:
+        print(f"Error creating trend unique key: {e}")
+        return False
+
+def table_exists(connection, table_name):
+    """Check whether a table exists in the current database"""
+    if get_dialect(connection) == 'sqlite':
+        query = """
+        SELECT COUNT(*) as count
+        FROM sqlite_master
+        WHERE type = 'table'
+            AND name = %s;
+        """
+    else:
+        query = """
+        SELECT COUNT(*) as count
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE()
+            AND TABLE_NAME = %s;
+        """
+    result = execute_query(connection, query, (table_name,), name='table_exists')
+    return bool(result) and result[0]['count'] > 0
+
+def create_latest_run_tables(connection):
+    """Create the materialized latest 1P run table and its refresh watermark table"""
+    queries = [
+        """
+        CREATE TABLE IF NOT EXISTS tc_latest_1p_run (
+            test_plan_id INT NOT NULL,
+            test_case_key VARCHAR(255) NOT NULL,
+            run_id BIGINT NOT NULL,
+            owner VARCHAR(255),
+            feature VARCHAR(255),
+            test_case_status VARCHAR(64),
+            created_at DATETIME,
+            PRIMARY KEY (test_plan_id, test_case_key)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tc_latest_1p_run_watermark (
+            test_plan_id INT NOT NULL PRIMARY KEY,
+            last_run_id BIGINT NOT NULL,
+            last_created_at DATETIME,
+            refreshed_at DATETIME
+        )
+        """
+    ]
+    try:
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute(query)
+        connection.commit()
+        return True
+    except Exception as e:
+        print(f"Error creating latest run tables: {e}")
+        return False
+
+def get_latest_run_watermark(connection, test_plan_id):
+    """Get the id of the last tc_test_run row folded into tc_latest_1p_run for a plan"""
+    query = """
+    SELECT last_run_id
+    FROM tc_latest_1p_run_watermark
+    WHERE test_plan_id = %s;
+    """
+    result = execute_query(connection, query, (test_plan_id,), name='get_latest_run_watermark')
+    return result[0]['last_run_id'] if result else 0
+
+def refresh_latest_run_table(connection, test_plan_id, tag_lookup=False):
+    """Fold runs newer than the plan's watermark into tc_latest_1p_run
+
+    Only rows with an id above the watermark are read, so the cost of a
+    refresh follows the number of new runs rather than the plan's history.
+    The table keeps the latest 1P run of every test case: runs are scoped
+    before they are ranked, as the row_number and max_id strategies do.
+    """
+    last_run_id = get_latest_run_watermark(connection, test_plan_id)
+
+    # Pin the upper bound first so runs inserted during the refresh are
+    # picked up by the next one instead of being skipped
+    bound_query = """
+    SELECT MAX(id) as max_run_id, MAX(created_at) as max_created_at
+    FROM tc_test_run
+    WHERE test_plan_id = %s
+        AND id > %s;
+    """
+    bound = execute_query(connection, bound_query, (test_plan_id, last_run_id), name='refresh_latest_run_table')
+    if not bound or bound[0]['max_run_id'] is None:
+        return 0
+    max_run_id = bound[0]['max_run_id']
+    max_created_at = bound[0]['max_created_at']
+
+    scope_condition, tag_params = get_scope_condition('feature', FEATURE_SCOPE_TAGS, tag_lookup)
+
+    # A stored row is replaced only by a run that is newer by (created_at, id);
+    # run_id and created_at are assigned last because MySQL applies the
+    # assignments left to right. Stored columns are qualified with the table
+    # name, as the SELECT below has columns of the same names.
+    def new(column):
+        return get_inserted_value(connection, column)
+    def old(column):
+        return f"tc_latest_1p_run.{column}"
+    newer = f"({new('created_at')}, {new('run_id')}) > ({old('created_at')}, {old('run_id')})"
+    upsert_query = f"""
+    INSERT INTO tc_latest_1p_run
+        (test_plan_id, test_case_key, run_id, owner, feature, test_case_status, created_at)
+    SELECT test_plan_id, test_case_key, id, owner, feature, test_case_status, created_at
+    FROM (
+        SELECT
+            test_plan_id,
+            test_case_key,
+            id,
+            owner,
+            feature,
+            test_case_status,
+            created_at,
+            ROW_NUMBER() OVER (
+                PARTITION BY test_case_key
+                ORDER BY created_at DESC, id DESC
+            ) as run_rank
+        FROM tc_test_run
+        WHERE test_plan_id = %s
+            AND id > %s
+            AND id <= %s
+            AND {scope_condition}
+    ) new_runs
+    WHERE run_rank = 1
+    {get_upsert_clause(connection, ('test_plan_id', 'test_case_key'))}
+        owner = CASE WHEN {newer} THEN {new('owner')} ELSE {old('owner')} END,
+        feature = CASE WHEN {newer} THEN {new('feature')} ELSE {old('feature')} END,
+        test_case_status = CASE WHEN {newer} THEN {new('test_case_status')} ELSE {old('test_case_status')} END,
+        run_id = CASE WHEN {newer} THEN {new('run_id')} ELSE {old('run_id')} END,
+        created_at = {get_greatest(connection, old('created_at'), new('created_at'))}
+    """
+    watermark_query = f"""
+    INSERT INTO tc_latest_1p_run_watermark
+        (test_plan_id, last_run_id, last_created_at, refreshed_at)
+    VALUES (%s, %s, %s, %s)
+    {get_upsert_clause(connection, ('test_plan_id',))}
+        last_run_id = {new('last_run_id')},
+        last_created_at = {get_greatest(connection, f"COALESCE(last_created_at, {new('last_created_at')})", new('last_created_at'))},
+        refreshed_at = {new('refreshed_at')}
+    """
+    try:
+        folded = execute_statement(
+            connection, upsert_query, [test_plan_id, last_run_id, max_run_id] + tag_params,
+            name='refresh_latest_run_table'
+        )
+        execute_statement(
+            connection, watermark_query, (test_plan_id, max_run_id, max_created_at, datetime.now()),
+            name='refresh_latest_run_table'
+        )
+        connection.commit()
+        print(f"Refreshed tc_latest_1p_run for plan {test_plan_id} up to run {max_run_id}")
+        return folded
+    except Exception as e:
+        print(f"Error refreshing latest run table: {e}")
+        connection.rollback()
+        return 0
+
+def get_overall_summary(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY):
+    """Get overall test summary statistics"""
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy)
+    query = f"""
+    WITH {latest_runs}
     SELECT 
         test_case_status,
         COUNT(DISTINCT test_case_key) as count
-    FROM test_data
+    FROM latest_test_runs
     GROUP BY test_case_status;
     """
-    return execute_query(connection, query)
+    return execute_query(connection, query, params, StatusCountRow, name='get_overall_summary')
 
-def get_squad_summary(connection, test_plan_id):
+def get_squad_summary(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY):
     """Get squad-wise summary"""
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy)
     query = f"""
-    WITH latest_runs AS (
-        SELECT 
-            test_case_key,
-            MAX(created_at) as latest_run_time
-        FROM tc_test_run
-        WHERE test_plan_id = {test_plan_id}
-            AND feature LIKE '%[1P]%'
-        GROUP BY test_case_key
-    ),
-    test_data AS (
-        SELECT 
-            tr.owner as squad,
-            tr.test_case_status,
-            tr.test_case_key
-        FROM tc_test_run tr
-        INNER JOIN latest_runs lr 
-            ON tr.test_case_key = lr.test_case_key 
-            AND tr.created_at = lr.latest_run_time
-        WHERE tr.test_plan_id = {test_plan_id}
-            AND tr.feature LIKE '%[1P]%'
-    )
+    WITH {latest_runs}
     SELECT 
-        squad,
+        owner as squad,
         COUNT(DISTINCT test_case_key) as total_tests,
         SUM(CASE WHEN test_case_status = 'passed' THEN 1 ELSE 0 END) as passed,
         SUM(CASE WHEN test_case_status = 'failed' THEN 1 ELSE 0 END) as failed,
@@ -103,36 +1080,17 @@ def get_squad_summary(connection, test_plan_id):
         SUM(CASE WHEN test_case_status = 'application_bug' THEN 1 ELSE 0 END) as app_bug,
         SUM(CASE WHEN test_case_status = 'not_implemented' THEN 1 ELSE 0 END) as not_implemented,
         ROUND(SUM(CASE WHEN test_case_status = 'passed' THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT test_case_key), 1) as success_rate
-    FROM test_data
-    GROUP BY squad
+    FROM latest_test_runs
+    GROUP BY owner
     ORDER BY total_tests DESC;
     """
-    return execute_query(connection, query)
+    return execute_query(connection, query, params, SquadSummaryRow, name='get_squad_summary')
 
-def get_feature_summary(connection, test_plan_id):
+def get_feature_summary(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY):
     """Get feature-wise summary"""
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy)
     query = f"""
-    WITH latest_runs AS (
-        SELECT 
-            test_case_key,
-            MAX(created_at) as latest_run_time
-        FROM tc_test_run
-        WHERE test_plan_id = {test_plan_id}
-            AND feature LIKE '%[1P]%'
-        GROUP BY test_case_key
-    ),
-    test_data AS (
-        SELECT 
-            tr.feature,
-            tr.test_case_status,
-            tr.test_case_key
-        FROM tc_test_run tr
-        INNER JOIN latest_runs lr 
-            ON tr.test_case_key = lr.test_case_key 
-            AND tr.created_at = lr.latest_run_time
-        WHERE tr.test_plan_id = {test_plan_id}
-            AND tr.feature LIKE '%[1P]%'
-    )
+    WITH {latest_runs}
     SELECT 
         feature,
         COUNT(DISTINCT test_case_key) as total_tests,
@@ -142,65 +1100,33 @@ def get_feature_summary(connection, test_plan_id):
         SUM(CASE WHEN test_case_status = 'application_bug' THEN 1 ELSE 0 END) as app_bug,
         SUM(CASE WHEN test_case_status = 'not_implemented' THEN 1 ELSE 0 END) as not_implemented,
         ROUND(SUM(CASE WHEN test_case_status = 'passed' THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT test_case_key), 1) as success_rate
-    FROM test_data
+    FROM latest_test_runs
     GROUP BY feature
     ORDER BY total_tests DESC;
     """
-    return execute_query(connection, query)
+    return execute_query(connection, query, params, FeatureSummaryRow, name='get_feature_summary')
 
-def get_feature_breakdown(connection, test_plan_id):
+def get_feature_breakdown(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY):
     """Get detailed feature breakdown"""
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy)
     query = f"""
-    WITH latest_runs AS (
-        SELECT 
-            test_case_key,
-            MAX(created_at) as latest_run_time
-        FROM tc_test_run
-        WHERE test_plan_id = {test_plan_id}
-            AND feature LIKE '%[1P]%'
-        GROUP BY test_case_key
-    )
+    WITH {latest_runs}
     SELECT 
-        tr.feature,
-        tr.owner as squad,
-        tr.test_case_status,
-        COUNT(*) as count
-    FROM tc_test_run tr
-    INNER JOIN latest_runs lr 
-        ON tr.test_case_key = lr.test_case_key 
-        AND tr.created_at = lr.latest_run_time
-    WHERE tr.test_plan_id = {test_plan_id}
-        AND tr.feature LIKE '%[1P]%'
-    GROUP BY tr.feature, tr.owner, tr.test_case_status
-    ORDER BY tr.feature, tr.owner, tr.test_case_status;
-    """
-    return execute_query(connection, query)
-
-def get_epic_summary(connection, test_plan_id):
+        feature,
+        owner as squad,
+        test_case_status,
+        COUNT(DISTINCT test_case_key) as count
+    FROM latest_test_runs
+    GROUP BY feature, owner, test_case_status
+    ORDER BY feature, owner, test_case_status;
+    """
+    return execute_query(connection, query, params, BreakdownRow, name='get_feature_breakdown')
+
+def get_epic_summary(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY):
     """Get EPIC-wise summary"""
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy)
     query = f"""
-    WITH latest_runs AS (
-        SELECT 
-            test_case_key,
-            MAX(created_at) as latest_run_time
-        FROM tc_test_run
-        WHERE test_plan_id = {test_plan_id}
-            AND feature LIKE '%[1P]%'
-        GROUP BY test_case_key
-    ),
-    test_data AS (
-        SELECT 
-            tr.test_case_key,
-            tr.test_case_status,
-            tr.feature,
-            tr.owner
-        FROM tc_test_run tr
-        INNER JOIN latest_runs lr 
-            ON tr.test_case_key = lr.test_case_key 
-            AND tr.created_at = lr.latest_run_time
-        WHERE tr.test_plan_id = {test_plan_id}
-            AND tr.feature LIKE '%[1P]%'
-    )
+    WITH {latest_runs}
     SELECT 
         COALESCE(e.epic_id, 'No EPIC') as epic_id,
         COALESCE(e.epic_title, 'Test cases without EPIC assignment') as epic_title,
@@ -211,50 +1137,818 @@ def get_epic_summary(connection, test_plan_id):
         SUM(CASE WHEN td.test_case_status = 'application_bug' THEN 1 ELSE 0 END) as app_bug,
         SUM(CASE WHEN td.test_case_status = 'not_implemented' THEN 1 ELSE 0 END) as not_implemented,
         ROUND(SUM(CASE WHEN td.test_case_status = 'passed' THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT td.test_case_key), 1) as success_rate
-    FROM test_data td
+    FROM latest_test_runs td
     LEFT JOIN tc_case_epic e ON td.test_case_key = e.test_case_id
     GROUP BY e.epic_id, e.epic_title
     ORDER BY total_tests DESC;
     """
-    return execute_query(connection, query)
+    return execute_query(connection, query, params, EpicSummaryRow, name='get_epic_summary')
+
+# Maps test_case_status values to the summary columns used in the report tables
+STATUS_COLUMNS = {
+    'passed': 'passed',
+    'failed': 'failed',
+    'blocked': 'blocked',
+    'application_bug': 'app_bug',
+    'not_implemented': 'not_implemented'
+}
+
+# Result rows of the report sections. Named tuples keep no per-row dict;
+# counts are ints and success rates floats from the moment a row is built.
+SUMMARY_FIELDS = ('total_tests', 'passed', 'failed', 'blocked', 'app_bug', 'not_implemented', 'success_rate')
+StatusCountRow = namedtuple('StatusCountRow', ('test_case_status', 'count'))
+SquadSummaryRow = namedtuple('SquadSummaryRow', ('squad',) + SUMMARY_FIELDS)
+FeatureSummaryRow = namedtuple('FeatureSummaryRow', ('feature',) + SUMMARY_FIELDS)
+BreakdownRow = namedtuple('BreakdownRow', ('feature', 'squad', 'test_case_status', 'count'))
+EpicSummaryRow = namedtuple('EpicSummaryRow', ('epic_id', 'epic_title') + SUMMARY_FIELDS)
+
+def get_latest_run_snapshot(connection, test_plan_id, strategy=DEFAULT_LATEST_RUN_STRATEGY, tag_lookup=False):
+    """Get the latest run of every 1P test case, joined with its EPICs, in one scan
+
+    test_plan_id may be a list of plans; every row is tagged with its plan.
+    Errors are raised rather than returning part of the snapshot.
+    """
+    query, params = get_latest_run_snapshot_query(test_plan_id, strategy, tag_lookup=tag_lookup)
+    return list(stream_query(connection, query, params, SnapshotRow, name='get_latest_run_snapshot'))
+
+# Columns of a snapshot row, in the order the snapshot query selects them
+SNAPSHOT_FIELDS = (
+    'test_plan_id', 'run_id', 'test_case_key', 'squad', 'feature', 'test_case_status',
+    'created_at', 'epic_id', 'epic_title'
+)
+SnapshotRow = namedtuple('SnapshotRow', SNAPSHOT_FIELDS)
+
+def get_latest_run_snapshot_query(test_plan_id, strategy, tags=FEATURE_SCOPE_TAGS, ordered=False,
+                                  tag_lookup=False):
+    """Get the latest-run snapshot query and its parameters for a resolved strategy
+
+    ordered sorts the rows by plan and run, so the EPIC rows of a run are adjacent.
+    """
+    latest_runs, params = get_latest_runs_cte(test_plan_id, strategy, tags, tag_lookup)
+    order_by = "\n    ORDER BY tr.test_plan_id, tr.id" if ordered else ""
+    query = f"""
+    WITH {latest_runs}
+    SELECT
+        tr.test_plan_id,
+        tr.id as run_id,
+        tr.test_case_key,
+        tr.owner as squad,
+        tr.feature,
+        tr.test_case_status,
+        tr.created_at,
+        e.epic_id,
+        e.epic_title
+    FROM latest_test_runs tr
+    LEFT JOIN tc_case_epic e ON tr.test_case_key = e.test_case_id{order_by};
+    """
+    return query, params
+
+def get_success_rate(passed, total_tests):
+    """Get success rate rounded half-up to one decimal, matching MySQL ROUND()"""
+    if not total_tests:
+        return Decimal('0.0')
+    rate = Decimal(passed) * 100 / Decimal(total_tests)
+    return rate.quantize(Decimal('0.1'), rounding=ROUND_HALF_UP)
+
+def new_status_counter():
+    """Create an empty per-group counter of test cases and status counts"""
+    counter = {'total_tests': 0}
+    for column in STATUS_COLUMNS.values():
+        counter[column] = 0
+    return counter
+
+def count_status(counter, status, sign=1, new_test_case=True):
+    """Add a test case's status to a per-group counter, or remove it with sign=-1
+
+    new_test_case is False for a repeated row of a test case already
+    counted in the group, which adds to its status but not to its total.
+    """
+    if new_test_case:
+        counter['total_tests'] += sign
+    column = STATUS_COLUMNS.get(status)
+    if column:
+        counter[column] += sign
+
+class SummaryTable(list):
+    """Summary rows that can also be read column by column, for whole-column findings rules
+
+    Rows are the named tuples of one summary row type. Counts are held as
+    array('i'), success rates as array('d') and names as lists. summarize_counters() fills the columns the findings rules
+    read while it builds the rows; any other column, or every column of
+    a table built from plain rows, is read with one pass on first use.
+    Masks and selections use map(), compress() and the array methods,
+    which keep the per-row loop in C. Rows stay in their summary order.
+    """
+
+    COUNT_FIELDS = ('total_tests',) + tuple(STATUS_COLUMNS.values())
+
+    def __init__(self, rows=(), columns=None):
+        super().__init__(rows)
+        self.columns = columns or {}
+
+    def column(self, field):
+        """Get a field of every row as a column"""
+        if field not in self.columns:
+            values = map(attrgetter(field), self)
+            if field == 'success_rate':
+                self.columns[field] = array('d', map(float, values))
+            elif field in self.COUNT_FIELDS:
+                self.columns[field] = array('i', values)
+            else:
+                self.columns[field] = list(values)
+        return self.columns[field]
+
+    def compare(self, field, op, value):
+        """Get a mask of the rows whose field compares true against a value"""
+        return map(op, self.column(field), repeat(value))
+
+    def select(self, *masks):
+        """Get the rows selected by every mask"""
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = map(and_, mask, other)
+        return list(compress(self, mask))
+
+    def nonzero(self, field):
+        """Get the rows whose field is not zero"""
+        return list(compress(self, self.column(field)))
+
+    def top(self, field, count):
+        """Get the count rows with the highest values, ties in summary order"""
+        values = self.column(field)
+        return [self[index] for index in nlargest(count, range(len(values)), key=values.__getitem__)]
+
+def summarize_counters(counters, row_type):
+    """Turn per-group counters, keyed by the row type's name fields, into summary rows ordered by total tests
+
+    The columns the findings rules read are collected in the same pass,
+    from values already at hand, and reordered with the rows.
+    """
+    rows, total_tests_column, app_bug_column, not_implemented_column, success_rate_column = [], [], [], [], []
+    for name, counter in counters.items():
+        total_tests = counter['total_tests']
+        if not total_tests:
+            continue
+        app_bug = counter['app_bug']
+        not_implemented = counter['not_implemented']
+        success_rate = float(get_success_rate(counter['passed'], total_tests))
+        rows.append(row_type._make(name + (
+            total_tests, counter['passed'], counter['failed'], counter['blocked'],
+            app_bug, not_implemented, success_rate
+        )))
+        total_tests_column.append(total_tests)
+        app_bug_column.append(app_bug)
+        not_implemented_column.append(not_implemented)
+        success_rate_column.append(success_rate)
+
+    # Stable, so ties keep their order as with sorting the rows themselves
+    order = sorted(range(len(rows)), key=total_tests_column.__getitem__, reverse=True)
+    return SummaryTable([rows[index] for index in order], {
+        'total_tests': array('i', [total_tests_column[index] for index in order]),
+        'app_bug': array('i', [app_bug_column[index] for index in order]),
+        'not_implemented': array('i', [not_implemented_column[index] for index in order]),
+        'success_rate': array('d', [success_rate_column[index] for index in order])
+    })
+
+def new_report_counters():
+    """Create the empty counters every report section is summarized from"""
+    return {
+        'status': defaultdict(int),
+        'squad': defaultdict(new_status_counter),
+        'feature': defaultdict(new_status_counter),
+        'epic': defaultdict(new_status_counter),
+        'breakdown': defaultdict(int)
+    }
+
+def count_case(counters, case, epic_links, sign=1):
+    """Add a test case's latest run to the report counters, or remove it with sign=-1
+
+    case is a row with squad, feature and test_case_status fields. Each
+    test case has one latest run per plan, so it counts once in its
+    status, squad, feature and breakdown row. epic_links lists the case's
+    (epic_id, epic_title) pairs, or (None, None) for a case without EPIC,
+    once per joined row.
+    """
+    squad, feature, status = case.squad, case.feature, case.test_case_status
+    counters['status'][status] += sign
+    count_status(counters['squad'][(squad,)], status, sign)
+    count_status(counters['feature'][(feature,)], status, sign)
+    counters['breakdown'][(feature, squad, status)] += sign
+    counted = set()
+    for epic_link in epic_links:
+        count_status(counters['epic'][epic_link], status, sign, epic_link not in counted)
+        counted.add(epic_link)
+
+def group_snapshot_cases(snapshot):
+    """Group snapshot rows, repeated once per linked EPIC, into runs and their EPIC links"""
+    cases = {}
+    for row in snapshot:
+        if row.run_id not in cases:
+            cases[row.run_id] = (row, [])
+        cases[row.run_id][1].append((row.epic_id, row.epic_title))
+    return cases.values()
+
+def summarize_report_counters(counters):
+    """Build all five report result sets from the report counters"""
+    overall_summary = [
+        StatusCountRow(status, count)
+        for status, count in counters['status'].items()
+        if count > 0
+    ]
+
+    # Case-insensitive ordering to match the database collation
+    feature_breakdown = [
+        BreakdownRow(feature, squad, status, count)
+        for (feature, squad, status), count in sorted(
+            counters['breakdown'].items(),
+            key=lambda x: tuple((value or '').lower() for value in x[0])
+        )
+        if count > 0
+    ]
+
+    epic_summary = summarize_counters(counters['epic'], EpicSummaryRow)
+    for index, epic in enumerate(epic_summary):
+        if epic.epic_id is None:
+            epic = epic._replace(epic_id='No EPIC')
+        if epic.epic_title is None:
+            epic = epic._replace(epic_title='Test cases without EPIC assignment')
+        epic_summary[index] = epic
+
+    return {
+        'overall_summary': overall_summary,
+        'squad_summary': summarize_counters(counters['squad'], SquadSummaryRow),
+        'feature_summary': summarize_counters(counters['feature'], FeatureSummaryRow),
+        'feature_breakdown': feature_breakdown,
+        'epic_summary': epic_summary
+    }
+
+def build_report_data(snapshot):
+    """Build all five report result sets from a latest-run snapshot"""
+    counters = new_report_counters()
+    for case, epic_links in group_snapshot_cases(snapshot):
+        count_case(counters, case, epic_links)
+    return summarize_report_counters(counters)
+
+def build_streamed_report_data(rows, test_plan_ids):
+    """Build each plan's result sets from snapshot rows ordered by plan and run
+
+    Every run is counted as soon as its last EPIC row has been read, so
+    only the counters are held: memory depends on the number of squads,
+    features and EPICs, not on the number of runs.
+    """
+    counters = {test_plan_id: new_report_counters() for test_plan_id in test_plan_ids}
+    current_run = case = None
+    epic_links = []
+    for row in rows:
+        if (row.test_plan_id, row.run_id) != current_run:
+            if case is not None:
+                count_case(counters[current_run[0]], case, epic_links)
+            current_run = (row.test_plan_id, row.run_id)
+            case = row
+            epic_links = []
+        epic_links.append((row.epic_id, row.epic_title))
+    if case is not None:
+        count_case(counters[current_run[0]], case, epic_links)
+    return {test_plan_id: summarize_report_counters(counters[test_plan_id]) for test_plan_id in test_plan_ids}
+
+def get_streamed_report_data(connection, test_plan_ids, strategy=DEFAULT_LATEST_RUN_STRATEGY,
+                             scope=DEFAULT_REPORT_SCOPE, tag_lookup=False):
+    """Stream the snapshot of plans through an unbuffered cursor into their result sets"""
+    query, params = get_latest_run_snapshot_query(
+        list(test_plan_ids), strategy, get_report_scope(scope)['tags'], ordered=True, tag_lookup=tag_lookup
+    )
+    rows = stream_query(connection, query, params, SnapshotRow, name='get_streamed_report_data')
+    return build_streamed_report_data(rows, test_plan_ids)
+
+@lru_cache(maxsize=None)
+def get_source_hash():
+    """Get a short hash of this script, so outputs of different versions can be told apart"""
+    with open(__file__, 'rb') as source:
+        return hashlib.sha256(source.read()).hexdigest()[:12]
+
+def get_data_fingerprints(connection, test_plan_ids):
+    """Get a change marker of every plan's runs: highest id, latest run, run count and EPIC checksum
+
+    The run aggregates are read from the covering (test_plan_id,
+    test_case_key, created_at) index alone, so they catch added and
+    deleted runs but not runs updated in place. The EPIC link checksum
+    covers only the links of the plan's test cases and catches remapped
+    test cases and renamed EPICs. Plans without runs are left out.
+    """
+    placeholders = ', '.join(['%s'] * len(test_plan_ids))
+    query = f"""
+    SELECT
+        test_plan_id,
+        MAX(id) as max_run_id,
+        MAX(created_at) as max_created_at,
+        COUNT(*) as run_count
+    FROM tc_test_run
+    WHERE test_plan_id IN ({placeholders})
+    GROUP BY test_plan_id;
+    """
+    epic_query = f"""
+    SELECT
+        plan_cases.test_plan_id,
+        {get_checksum(connection, 'e.test_case_id', 'e.epic_id', 'e.epic_title')} as checksum
+    FROM (
+        SELECT DISTINCT test_plan_id, test_case_key
+        FROM tc_test_run
+        WHERE test_plan_id IN ({placeholders})
+    ) plan_cases
+    JOIN tc_case_epic e ON e.test_case_id = plan_cases.test_case_key
+    GROUP BY plan_cases.test_plan_id;
+    """
+    epic_checksums = {
+        row['test_plan_id']: int(row['checksum'])
+        for row in execute_query(connection, epic_query, list(test_plan_ids), name='get_data_fingerprints')
+    }
+    return {
+        row['test_plan_id']: {
+            'max_run_id': row['max_run_id'],
+            'max_created_at': str(row['max_created_at']),
+            'run_count': row['run_count'],
+            'epic_checksum': epic_checksums.get(row['test_plan_id'], 0)
+        }
+        for row in execute_query(connection, query, list(test_plan_ids), name='get_data_fingerprints')
+    }
+
+def get_render_signature(asset_mode='inline', compression=(), keep_plain=True, trend_runs=DEFAULT_TREND_RUNS,
+                         scope=DEFAULT_REPORT_SCOPE, breakdown_mode='table'):
+    """Describe how a report is rendered, so a new version or option change forces a rebuild
+
+    Scopes that keep a trend carry today's date, so the first run of a day
+    rebuilds the report and saves the day's trend row even without new runs.
+    """
+    return {
+        'run_date': datetime.now().strftime('%Y-%m-%d') if get_report_scope(scope)['trend'] else None,
+        'source': get_source_hash(),
+        'scope': scope,
+        'assets': asset_mode,
+        'compression': list(compression),
+        'keep_plain': keep_plain,
+        'trend_runs': trend_runs,
+        'breakdown': breakdown_mode,
+        'squads': _squad_registry.signature
+    }
+
+def get_fingerprint_path(filename):
+    """Get the path of the fingerprint stored next to a report"""
+    return f"{filename}.fingerprint.json"
+
+def load_report_fingerprint(filename):
+    """Load the fingerprint stored next to a report, or None if there is none"""
+    try:
+        with open(get_fingerprint_path(filename), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_report_current(filename, fingerprint):
+    """Check whether the report at filename was built from data with this fingerprint"""
+    stored = load_report_fingerprint(filename)
+    if not stored or stored.get('fingerprint') != fingerprint:
+        return False
+    return all(os.path.exists(path) for path in stored.get('outputs', []))
+
+def get_linked_files(filename, assets=None, breakdown_mode='table'):
+    """Get the paths of the shared assets and breakdown data file a report links to"""
+    directory = os.path.dirname(filename)
+    linked = [os.path.join(directory, name) for name in (assets or {}).values()]
+    if breakdown_mode == 'external':
+        linked.append(get_breakdown_filename(filename))
+    return linked
+
+def save_report_fingerprint(filename, fingerprint, write_stats, keep_plain=True, summary=None, linked=()):
+    """Store the fingerprint of the data a report was built from next to it
+
+    summary keeps the report's headline numbers so a skipped plan can
+    still be listed with them. The report only counts as current while
+    its outputs and the linked files (see get_linked_files) all exist.
+    """
+    outputs = [output['path'] for output in write_stats['compressed']]
+    if keep_plain:
+        outputs.insert(0, filename)
+    outputs.extend(linked)
+    with open(get_fingerprint_path(filename), 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': fingerprint, 'outputs': outputs, 'summary': summary}, f, indent=2)
+
+def remove_report_fingerprint(filename):
+    """Remove the fingerprint stored next to a report that was rewritten without one"""
+    try:
+        os.remove(get_fingerprint_path(filename))
+    except FileNotFoundError:
+        pass
+
+DEFAULT_CACHE_PATH = '1p_report_cache.db'
+DEFAULT_CACHE_SIZE_MB = 64
+
+class ReportCache:
+    """On-disk LRU cache of report aggregates keyed by plan and data fingerprint
+
+    The key also holds the latest-run strategy, the scope and the
+    script version, since each of them changes the aggregates. Aggregates
+    are pickled into a local SQLite file. When the cached entries exceed
+    max_bytes, the least recently used ones are evicted. A file written
+    with another VERSION is emptied when opened.
+    """
+
+    # Bumped whenever the pickled report data changes shape
+    VERSION = 2
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript("""
+        CREATE TABLE IF NOT EXISTS report_cache (
+            test_plan_id INTEGER NOT NULL,
+            watermark TEXT NOT NULL,
+            report_data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            PRIMARY KEY (test_plan_id, watermark)
+        );
+        CREATE INDEX IF NOT EXISTS idx_report_cache_last_used ON report_cache (last_used_at);
+        """)
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != self.VERSION:
+            self._connection.execute("DELETE FROM report_cache")
+            self._connection.execute(f"PRAGMA user_version = {self.VERSION}")
+            self._connection.commit()
+
+    @staticmethod
+    def get_watermark(data_fingerprint, strategy, scope):
+        return json.dumps({
+            'data': data_fingerprint,
+            'strategy': strategy,
+            'scope': scope,
+            'source': get_source_hash()
+        }, sort_keys=True)
+
+    def get(self, test_plan_id, data_fingerprint, strategy, scope):
+        """Get a plan's aggregates for exactly this data fingerprint, resolved strategy and scope, or None"""
+        watermark = self.get_watermark(data_fingerprint, strategy, scope)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT report_data FROM report_cache WHERE test_plan_id = ? AND watermark = ?",
+                (test_plan_id, watermark)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE report_cache SET last_used_at = ? WHERE test_plan_id = ? AND watermark = ?",
+                (time.time(), test_plan_id, watermark)
+            )
+            self._connection.commit()
+        return pickle.loads(row[0])
+
+    def get_latest(self, test_plan_id, strategy, scope):
+        """Get the most recently cached aggregates of a plan for this strategy, scope and script version
+
+        Any data fingerprint matches, so the aggregates may predate the
+        latest runs.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT watermark, report_data FROM report_cache WHERE test_plan_id = ? ORDER BY created_at DESC",
+                (test_plan_id,)
+            ).fetchall()
+        for watermark, report_data in rows:
+            key = json.loads(watermark)
+            if (key['strategy'], key['scope'], key['source']) == (strategy, scope, get_source_hash()):
+                return pickle.loads(report_data)
+        return None
+
+    def put(self, test_plan_id, data_fingerprint, strategy, scope, report_data):
+        """Cache a plan's aggregates, then evict entries until the cache fits its size"""
+        blob = pickle.dumps(report_data, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO report_cache "
+                "(test_plan_id, watermark, report_data, size, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (test_plan_id, self.get_watermark(data_fingerprint, strategy, scope), blob, len(blob), now, now)
+            )
+            total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM report_cache").fetchone()[0]
+            if total > self.max_bytes:
+                entries = self._connection.execute(
+                    "SELECT test_plan_id, watermark, size FROM report_cache ORDER BY last_used_at"
+                ).fetchall()
+                for plan_id, watermark, size in entries:
+                    if total <= self.max_bytes:
+                        break
+                    self._connection.execute(
+                        "DELETE FROM report_cache WHERE test_plan_id = ? AND watermark = ?",
+                        (plan_id, watermark)
+                    )
+                    total -= size
+            self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+DEFAULT_STATE_DIR = '.1p_report_state'
+AGGREGATION_STATE_VERSION = 3
+
+# Fields of a test case's latest run kept in the aggregation state
+CASE_FIELDS = ('run_id', 'test_case_key', 'squad', 'feature', 'test_case_status', 'created_at')
+CaseRow = namedtuple('CaseRow', CASE_FIELDS)
+
+# A plan's new runs, flagged with whether they are in the feature scope
+NewRunRow = namedtuple('NewRunRow', CASE_FIELDS + ('in_scope',))
+
+def get_aggregation_state_path(state_dir, test_plan_id):
+    """Get the file holding a plan's saved latest-run state"""
+    return os.path.join(state_dir, f"plan_{test_plan_id}.state.pickle")
+
+def pack_values(values):
+    """Pack values into a tuple, sharing repeated strings so the saved state stays small"""
+    return tuple(sys.intern(value) if isinstance(value, str) else value for value in values)
+
+def load_aggregation_state(state_dir, test_plan_id):
+    """Load a plan's saved latest-run state and report counters, or None"""
+    try:
+        with open(get_aggregation_state_path(state_dir, test_plan_id), 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if state.get('version') != AGGREGATION_STATE_VERSION:
+        return None
+    counters = new_report_counters()
+    for name, groups in state['counters'].items():
+        counters[name].update(groups)
+    state['counters'] = counters
+    return state
+
+def save_aggregation_state(state_dir, state):
+    """Save a plan's latest-run state atomically"""
+    os.makedirs(state_dir, exist_ok=True)
+    path = get_aggregation_state_path(state_dir, state['test_plan_id'])
+    saved = dict(state, counters={name: dict(groups) for name, groups in state['counters'].items()})
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+def build_aggregation_state(connection, test_plan_id, data_fingerprint, strategy=DEFAULT_LATEST_RUN_STRATEGY,
+                            tag_lookup=False):
+    """Build a plan's latest-run state from a full snapshot, raising if it cannot be read completely"""
+    state = {
+        'version': AGGREGATION_STATE_VERSION,
+        'test_plan_id': test_plan_id,
+        'last_run_id': data_fingerprint['max_run_id'],
+        'run_count': data_fingerprint['run_count'],
+        'epic_checksum': data_fingerprint['epic_checksum'],
+        'strategy': strategy,
+        'cases': {},
+        'epic_links': {},
+        'counters': new_report_counters()
+    }
+    for row, epic_links in group_snapshot_cases(
+            get_latest_run_snapshot(connection, test_plan_id, strategy, tag_lookup)):
+        state['cases'][row.test_case_key] = pack_values(getattr(row, field) for field in CASE_FIELDS)
+        state['epic_links'][row.test_case_key] = [pack_values(link) for link in epic_links]
+        count_case(state['counters'], row, epic_links)
+    return state
+
+def get_new_runs(connection, test_plan_id, after_run_id, up_to_run_id, tag_lookup=False):
+    """Get a plan's runs in an id range, flagged with whether they are in the feature scope"""
+    scope_condition, tag_params = get_scope_condition('feature', FEATURE_SCOPE_TAGS, tag_lookup)
+    query = f"""
+    SELECT
+        id as run_id,
+        test_case_key,
+        owner as squad,
+        feature,
+        test_case_status,
+        created_at,
+        {scope_condition} as in_scope
+    FROM tc_test_run
+    WHERE test_plan_id = %s
+        AND id > %s
+        AND id <= %s
+    ORDER BY id;
+    """
+    params = tag_params + [test_plan_id, after_run_id, up_to_run_id]
+    return list(stream_query(connection, query, params, NewRunRow, name='get_new_runs'))
+
+def get_epic_links(connection, test_case_keys):
+    """Get the (epic_id, epic_title) links of test cases, (None, None) for cases without EPIC"""
+    epic_links = {key: [] for key in test_case_keys}
+    if test_case_keys:
+        placeholders = ', '.join(['%s'] * len(test_case_keys))
+        query = f"""
+        SELECT test_case_id, epic_id, epic_title
+        FROM tc_case_epic
+        WHERE test_case_id IN ({placeholders});
+        """
+        for test_case_id, epic_id, epic_title in stream_query(
+                connection, query, list(test_case_keys), name='get_epic_links'):
+            epic_links[test_case_id].append(pack_values((epic_id, epic_title)))
+    return {key: links or [(None, None)] for key, links in epic_links.items()}
+
+def fold_new_runs(connection, state, data_fingerprint, tag_lookup=False):
+    """Fold runs newer than the state's watermark into it; return the runs read, or None to rebuild
+
+    A run replaces a test case's stored run only when it is newer in the
+    order of the state's strategy: by id for max_id, by (created_at, id)
+    for the others. Only the replaced cases are taken out of and put back
+    into the counters.
+    """
+    new_runs = get_new_runs(
+        connection, state['test_plan_id'], state['last_run_id'], data_fingerprint['max_run_id'], tag_lookup
+    )
+    # Fewer runs than the count grew by means rows were deleted
+    if data_fingerprint['run_count'] - state['run_count'] != len(new_runs):
+        return None
+
+    if state['strategy'] == 'max_id':
+        run_order = attrgetter('run_id')
+    else:
+        run_order = attrgetter('created_at', 'run_id')
+
+    replaced = {}
+    for run in new_runs:
+        if not run.in_scope:
+            continue
+        key = run.test_case_key
+        current = replaced.get(key)
+        if current is None and key in state['cases']:
+            current = CaseRow._make(state['cases'][key])
+        if current and run_order(current) >= run_order(run):
+            continue
+        replaced[key] = run
+
+    new_keys = [key for key in replaced if key not in state['epic_links']]
+    state['epic_links'].update(get_epic_links(connection, new_keys))
+    for key, run in replaced.items():
+        epic_links = state['epic_links'][key]
+        if key in state['cases']:
+            count_case(state['counters'], CaseRow._make(state['cases'][key]), epic_links, sign=-1)
+        state['cases'][key] = pack_values(getattr(run, field) for field in CASE_FIELDS)
+        count_case(state['counters'], run, epic_links)
+
+    state['last_run_id'] = data_fingerprint['max_run_id']
+    state['run_count'] = data_fingerprint['run_count']
+    return len(new_runs)
+
+def get_incremental_report_data(connection, test_plan_id, state_dir=DEFAULT_STATE_DIR,
+                                strategy=DEFAULT_LATEST_RUN_STRATEGY, data_fingerprint=None, tag_lookup=False):
+    """Build a plan's report data by folding only runs added since the saved state
+
+    The state is rebuilt from a full snapshot when there is none, when
+    runs were deleted, when the EPIC links changed or when it was built
+    with another strategy. Like the data fingerprint, it does not follow
+    runs updated in place. Read errors are raised, so the state is only
+    saved once it has been built or folded from complete results.
+    """
+    if data_fingerprint is None:
+        data_fingerprint = get_data_fingerprints(connection, [test_plan_id]).get(test_plan_id)
+    if data_fingerprint is None:
+        return build_report_data([])
+
+    state = load_aggregation_state(state_dir, test_plan_id)
+    if state and (state['epic_checksum'] != data_fingerprint['epic_checksum']
+                  or state['strategy'] != strategy
+                  or state['last_run_id'] > data_fingerprint['max_run_id']):
+        state = None
+
+    folded = fold_new_runs(connection, state, data_fingerprint, tag_lookup) if state else None
+    if folded is None:
+        print(f"Building aggregation state for plan {test_plan_id} from a full snapshot")
+        state = build_aggregation_state(connection, test_plan_id, data_fingerprint, strategy, tag_lookup)
+        save_aggregation_state(state_dir, state)
+    else:
+        print(f"Folded {folded} new runs into the aggregation state of plan {test_plan_id}")
+        if folded:
+            save_aggregation_state(state_dir, state)
+    return summarize_report_counters(state['counters'])
+
+# Icon class and initial of every known squad; other squads get
+# DEFAULT_SQUAD_ICON_CLASS and the first letter of their name
+DEFAULT_SQUADS = {
+    'A-Team': {'icon_class': 'squad-a', 'initial': 'A'},
+    'Rajput Royals': {'icon_class': 'squad-r', 'initial': 'R'},
+    'Mavericks': {'icon_class': 'squad-m', 'initial': 'M'},
+    'Pirates': {'icon_class': 'squad-p', 'initial': 'P'},
+    'Ganges Gangsters': {'icon_class': 'squad-g', 'initial': 'G'},
+    'Spartans': {'icon_class': 'squad-s', 'initial': 'S'},
+    'Chalukyas': {'icon_class': 'squad-ch', 'initial': 'C'},
+    'Dravidian Dynamos': {'icon_class': 'squad-d', 'initial': 'D'},
+    'Hackers & Painters': {'icon_class': 'squad-h', 'initial': 'H'},
+    'ShadowFax': {'icon_class': 'squad-sh', 'initial': 'S'},
+    'Autobots': {'icon_class': 'squad-au', 'initial': 'A'},
+    'Chera super kings': {'icon_class': 'squad-c', 'initial': 'C'},
+    'Rashtrakutas': {'icon_class': 'squad-r', 'initial': 'R'}
+}
+DEFAULT_SQUAD_ICON_CLASS = 'squad-d'
+
+# Display text of test case statuses; other statuses are title-cased
+STATUS_DISPLAY = {
+    'passed': 'Passed',
+    'failed': 'Failed',
+    'blocked': 'Blocked',
+    'application_bug': 'Application Bug',
+    'not_implemented': 'Not Implemented'
+}
+
+class LookupTable(dict):
+    """Dict that computes a missing key's value on first lookup and keeps it"""
+
+    def __init__(self, compute):
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, key):
+        value = self[key] = self.compute(key)
+        return value
+
+class SquadRegistry:
+    """Squad icons and status labels, with each squad's icon and status badge HTML built once
+
+    Starts from DEFAULT_SQUADS and STATUS_DISPLAY; a --squad-config file
+    adds or overrides squads and statuses, so a new squad needs no code
+    change. icon_html and status_html map a squad or status straight to
+    its HTML snippet, so rendering a row is a single dict lookup.
+    """
+
+    def __init__(self, squads=None, statuses=None):
+        self.squads = {name: dict(entry) for name, entry in DEFAULT_SQUADS.items()}
+        for name, entry in (squads or {}).items():
+            self.squads[name] = dict(self.squads.get(name, {}), **entry)
+        self.statuses = dict(STATUS_DISPLAY, **(statuses or {}))
+        self.signature = hashlib.sha256(
+            json.dumps([self.squads, self.statuses], sort_keys=True).encode()
+        ).hexdigest()[:12]
+
+        self.icon_html = LookupTable(self.render_icon)
+        self.status_html = LookupTable(self.render_status)
+        for name in self.squads:
+            self.icon_html[name]
+        for status in self.statuses:
+            self.status_html[status]
+
+    def __reduce__(self):
+        # Render worker processes rebuild the registry from its configuration
+        return (SquadRegistry, (self.squads, self.statuses))
+
+    @classmethod
+    def from_file(cls, path):
+        """Load squads and statuses from a JSON file shaped like
+        {"squads": {"Name": {"icon_class": "squad-a", "initial": "N"}}, "statuses": {"skipped": "Skipped"}}
+
+        Both keys and both squad fields are optional; raises ValueError for
+        a file of another shape.
+        """
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("expected a JSON object")
+        squads = config.get('squads', {})
+        statuses = config.get('statuses', {})
+        if not isinstance(squads, dict) or not all(
+                isinstance(entry, dict) and set(entry) <= {'icon_class', 'initial'}
+                and all(isinstance(value, str) for value in entry.values())
+                for entry in squads.values()):
+            raise ValueError('"squads" must map names to {"icon_class": ..., "initial": ...}')
+        if not isinstance(statuses, dict) or not all(isinstance(value, str) for value in statuses.values()):
+            raise ValueError('"statuses" must map statuses to display text')
+        return cls(squads, statuses)
+
+    def get_icon_class(self, squad_name):
+        return self.squads.get(squad_name, {}).get('icon_class', DEFAULT_SQUAD_ICON_CLASS)
+
+    def get_initial(self, squad_name):
+        initial = self.squads.get(squad_name, {}).get('initial')
+        return squad_name[0].upper() if initial is None else initial
+
+    def get_status_display(self, status):
+        return self.statuses.get(status, status.title())
+
+    def render_icon(self, squad_name):
+        return f'<span class="squad-icon {self.get_icon_class(squad_name)}">{self.get_initial(squad_name)}</span>'
+
+    def render_status(self, status):
+        status_class = f"status-{status.replace('_', '-')}"
+        return f'<span class="status {status_class}">{self.get_status_display(status)}</span>'
+
+# Registry reports are rendered with; replaced by --squad-config
+_squad_registry = SquadRegistry()
+
+def set_squad_registry(registry):
+    """Render with a registry from now on; also initializes render worker processes"""
+    global _squad_registry
+    _squad_registry = registry
 
 def get_squad_icon_class(squad_name):
     """Get CSS class for squad icon based on squad name"""
-    squad_map = {
-        'A-Team': 'squad-a',
-        'Rajput Royals': 'squad-r',
-        'Mavericks': 'squad-m',
-        'Pirates': 'squad-p',
-        'Ganges Gangsters': 'squad-g',
-        'Spartans': 'squad-s',
-        'Chalukyas': 'squad-ch',
-        'Dravidian Dynamos': 'squad-d',
-        'Hackers & Painters': 'squad-h',
-        'ShadowFax': 'squad-sh',
-        'Autobots': 'squad-au',
-        'Chera super kings': 'squad-c',
-        'Rashtrakutas': 'squad-r'
-    }
-    return squad_map.get(squad_name, 'squad-d')
+    return _squad_registry.get_icon_class(squad_name)
 
 def get_squad_initial(squad_name):
     """Get initial letter for squad icon"""
-    initials_map = {
-        'A-Team': 'A',
-        'Rajput Royals': 'R',
-        'Mavericks': 'M',
-        'Pirates': 'P',
-        'Ganges Gangsters': 'G',
-        'Spartans': 'S',
-        'Chalukyas': 'C',
-        'Dravidian Dynamos': 'D',
-        'Hackers & Painters': 'H',
-        'ShadowFax': 'S',
-        'Autobots': 'A',
-        'Chera super kings': 'C',
-        'Rashtrakutas': 'R'
-    }
-    return initials_map.get(squad_name, squad_name[0].upper())
+    return _squad_registry.get_initial(squad_name)
 
 def get_health_class(success_rate):
     """Get health class based on success rate"""
@@ -271,82 +1965,274 @@ def get_health_class(success_rate):
 
 def get_status_display(status):
     """Get display text for status"""
-    status_map = {
-        'passed': 'Passed',
-        'failed': 'Failed',
-        'blocked': 'Blocked',
-        'application_bug': 'Application Bug',
-        'not_implemented': 'Not Implemented'
-    }
-    return status_map.get(status, status.title())
+    return _squad_registry.get_status_display(status)
+
+def get_trend_counts(overall_summary):
+    """Get the passed, failed, blocked, application bug and not implemented counts of a plan"""
+    counts = {item.test_case_status: item.count for item in overall_summary}
+    return tuple(counts.get(status, 0) for status in STATUS_COLUMNS)
+
+def get_trend_upsert_query(connection):
+    """Get the single-statement upsert of a plan's trend row for a day"""
+    count_columns = ('passed', 'failed', 'blocked', 'application_bug', 'not_implemented')
+    assignments = ',\n        '.join(
+        f"{column} = {get_inserted_value(connection, column)}" for column in count_columns
+    )
+    return f"""
+    INSERT INTO test_run_trend
+    (test_plan_id, passed, failed, blocked, application_bug, not_implemented, run_date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    {get_upsert_clause(connection, TREND_UNIQUE_KEY_COLUMNS)}
+        {assignments}
+    """
 
 def save_test_run_trend(connection, test_plan_id, overall_summary):
-    """Save test run results to test_run_trend table"""
+    """Save test run results to test_run_trend table
+
+    One upsert on the (test_plan_id, run_date) unique key, so concurrent
+    jobs reporting the same plan on the same day cannot duplicate the row.
+    Without the key the row is updated in place; see upsert_trend_rows.
+    """
+    return save_test_run_trends(connection, {test_plan_id: overall_summary})
+
+def save_test_run_trends(connection, plan_summaries):
+    """Save the trend rows of many plans with one executemany upsert
+
+    plan_summaries maps test plan IDs to their overall summaries.
+    """
+    # Current date in YYYY-MM-DD format
+    run_date = datetime.now().strftime('%Y-%m-%d')
+    rows = [
+        (test_plan_id,) + get_trend_counts(overall_summary) + (run_date,)
+        for test_plan_id, overall_summary in plan_summaries.items()
+    ]
+    if not rows:
+        return True
     try:
-        # Calculate totals from overall summary
-        passed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'passed'), 0)
-        failed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'failed'), 0)
-        blocked = next((item['count'] for item in overall_summary if item['test_case_status'] == 'blocked'), 0)
-        app_bug = next((item['count'] for item in overall_summary if item['test_case_status'] == 'application_bug'), 0)
-        not_implemented = next((item['count'] for item in overall_summary if item['test_case_status'] == 'not_implemented'), 0)
-        
-        # Current date in YYYY-MM-DD format
-        run_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Check if entry already exists for today
-        check_query = f"""
-        SELECT id FROM test_run_trend 
-        WHERE test_plan_id = {test_plan_id} AND run_date = '{run_date}'
-        """
-        
-        with connection.cursor() as cursor:
-            cursor.execute(check_query)
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing record
-                update_query = f"""
-                UPDATE test_run_trend 
-                SET passed = {passed}, 
-                    failed = {failed}, 
-                    blocked = {blocked}, 
-                    application_bug = {app_bug}, 
-                    not_implemented = {not_implemented}
-                WHERE test_plan_id = {test_plan_id} AND run_date = '{run_date}'
-                """
-                cursor.execute(update_query)
-                print(f"Updated existing trend record for plan {test_plan_id} on {run_date}")
-            else:
-                # Insert new record
-                insert_query = f"""
-                INSERT INTO test_run_trend 
-                (test_plan_id, passed, failed, blocked, application_bug, not_implemented, run_date)
-                VALUES ({test_plan_id}, {passed}, {failed}, {blocked}, {app_bug}, {not_implemented}, '{run_date}')
-                """
-                cursor.execute(insert_query)
-                print(f"Inserted new trend record for plan {test_plan_id} on {run_date}")
-            
-            connection.commit()
-            
+        upsert_trend_rows(connection, rows)
+        if len(rows) == 1:
+            print(f"Saved trend record for plan {rows[0][0]} on {run_date}")
+        else:
+            print(f"Saved trend records for {len(rows)} plans on {run_date}")
         return True
     except Exception as e:
         print(f"Error saving test run trend: {e}")
         connection.rollback()
         return False
 
+def upsert_trend_rows(connection, rows, has_unique_key=None):
+    """Upsert (test_plan_id, counts..., run_date) rows into test_run_trend and commit
+
+    The single-statement upsert only deduplicates when the unique key
+    exists (see --ensure-index). Without it, the rows already saved for a
+    plan and day are updated and only the others are inserted. Pass
+    has_unique_key to skip the check when writing many batches.
+    """
+    if has_unique_key is None:
+        has_unique_key = check_trend_unique_key(connection) is not None
+    if has_unique_key:
+        execute_statement(connection, get_trend_upsert_query(connection), rows, name='upsert_trend_rows', many=True)
+        connection.commit()
+        return
+
+    plan_ids = sorted({row[0] for row in rows})
+    run_dates = [row[-1] for row in rows]
+    existing_query = f"""
+    SELECT DISTINCT test_plan_id, run_date
+    FROM test_run_trend
+    WHERE test_plan_id IN ({', '.join(['%s'] * len(plan_ids))})
+        AND run_date BETWEEN %s AND %s;
+    """
+    existing = {
+        (row[0], str(row[1])[:10])
+        for row in stream_query(
+            connection, existing_query, plan_ids + [min(run_dates), max(run_dates)], name='upsert_trend_rows'
+        )
+    }
+    update_query = """
+    UPDATE test_run_trend
+    SET passed = %s,
+        failed = %s,
+        blocked = %s,
+        application_bug = %s,
+        not_implemented = %s
+    WHERE test_plan_id = %s AND run_date = %s
+    """
+    insert_query = """
+    INSERT INTO test_run_trend
+    (test_plan_id, passed, failed, blocked, application_bug, not_implemented, run_date)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+    updates = [row[1:-1] + (row[0], row[-1]) for row in rows if (row[0], str(row[-1])) in existing]
+    inserts = [row for row in rows if (row[0], str(row[-1])) not in existing]
+    if updates:
+        execute_statement(connection, update_query, updates, name='upsert_trend_rows', many=True)
+    if inserts:
+        execute_statement(connection, insert_query, inserts, name='upsert_trend_rows', many=True)
+    connection.commit()
+
+# Trend rows written per executemany while backfilling, to bound the statement size
+TREND_BACKFILL_BATCH_SIZE = 1000
+
+# A run of a plan's status history, as read by the trend backfill
+HistoryRunRow = namedtuple('HistoryRunRow', ('test_plan_id', 'test_case_key', 'test_case_status', 'created_at'))
+
+def get_trend_history_runs(connection, test_plan_ids, end_date, tag_lookup=False):
+    """Get the status history of plans up to the end of a day, sorted by plan and time"""
+    run_filter, params = get_run_filter(list(test_plan_ids), tag_lookup=tag_lookup)
+    query = f"""
+    SELECT test_plan_id, test_case_key, test_case_status, created_at
+    FROM tc_test_run
+    WHERE {run_filter}
+        AND created_at < %s
+    ORDER BY test_plan_id, created_at, id;
+    """
+    params = params + [(end_date + timedelta(days=1)).isoformat()]
+    return execute_query(connection, query, params, HistoryRunRow, name='get_trend_history_runs')
+
+def iter_daily_trend_rows(runs, start_date, end_date):
+    """Sweep runs sorted by plan and time, yielding a trend row for every plan and day
+
+    Each test case's status is replaced by its later runs, so the status
+    counts at a day boundary are those of the latest runs at the end of
+    that day, as a report generated then would have saved. Days without
+    runs repeat the previous day's counts; days before a plan's first run
+    get no row.
+    """
+    def close_days(test_plan_id, counts, day, next_day):
+        # The counts hold from day until the day before next_day
+        counts = tuple(counts[status] for status in STATUS_COLUMNS)
+        current = max(date.fromisoformat(day), start_date)
+        while current < next_day:
+            yield (test_plan_id,) + counts + (current.isoformat(),)
+            current += timedelta(days=1)
+
+    test_plan_id = day = None
+    latest_status = {}
+    counts = defaultdict(int)
+    for run in runs:
+        run_day = str(run.created_at)[:10]
+        if run.test_plan_id != test_plan_id:
+            if test_plan_id is not None:
+                yield from close_days(test_plan_id, counts, day, end_date + timedelta(days=1))
+            test_plan_id = run.test_plan_id
+            latest_status = {}
+            counts = defaultdict(int)
+        elif run_day != day:
+            yield from close_days(test_plan_id, counts, day, date.fromisoformat(run_day))
+        day = run_day
+        previous_status = latest_status.get(run.test_case_key)
+        if previous_status is not None:
+            counts[previous_status] -= 1
+        latest_status[run.test_case_key] = run.test_case_status
+        counts[run.test_case_status] += 1
+    if test_plan_id is not None:
+        yield from close_days(test_plan_id, counts, day, end_date + timedelta(days=1))
+
+def backfill_test_run_trends(connection, test_plan_ids, start_date, end_date, tag_lookup=False):
+    """Rebuild plans' daily trend rows between two dates from one sorted pass over their runs
+
+    Returns the number of trend rows written, or None on error.
+    """
+    with profile_stage('backfill_query'):
+        runs = get_trend_history_runs(connection, test_plan_ids, end_date, tag_lookup)
+    has_unique_key = check_trend_unique_key(connection) is not None
+    if not has_unique_key:
+        print("test_run_trend has no (test_plan_id, run_date) unique key, updating rows in place; "
+              "--ensure-index adds it")
+    written = 0
+    try:
+        with profile_stage('backfill_write'):
+            batch = []
+            for row in iter_daily_trend_rows(runs, start_date, end_date):
+                batch.append(row)
+                if len(batch) == TREND_BACKFILL_BATCH_SIZE:
+                    upsert_trend_rows(connection, batch, has_unique_key)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                upsert_trend_rows(connection, batch, has_unique_key)
+                written += len(batch)
+    except Exception as e:
+        print(f"Error backfilling test run trend: {e}")
+        connection.rollback()
+        return None
+    print(f"Backfilled {written} trend records for {len(test_plan_ids)} plans "
+          f"from {start_date} to {end_date} using {len(runs)} test runs")
+    return written
+
+# A saved trend row; its count fields are named as the STATUS_COLUMNS keys
+TrendRow = namedtuple('TrendRow', ('test_plan_id', 'run_date') + tuple(STATUS_COLUMNS))
+
+def get_trend_history(connection, test_plan_ids, limit, before_date=None):
+    """Get up to limit saved trend rows per plan before a day, oldest first, keyed by plan
+
+    A single plan reads backwards along the (test_plan_id, run_date) unique
+    key; several plans are ranked per plan in one query.
+    """
+    history = {test_plan_id: [] for test_plan_id in test_plan_ids}
+    if limit <= 0 or not test_plan_ids:
+        return history
+    before_date = before_date or datetime.now().strftime('%Y-%m-%d')
+    columns = ', '.join(TrendRow._fields)
+    if len(test_plan_ids) == 1:
+        query = f"""
+    SELECT {columns}
+    FROM test_run_trend
+    WHERE test_plan_id = %s
+        AND run_date < %s
+    ORDER BY run_date DESC
+    LIMIT %s;
+    """
+        params = [test_plan_ids[0], before_date, limit]
+    else:
+        query = f"""
+    WITH ranked_trend AS (
+        SELECT
+            {columns},
+            ROW_NUMBER() OVER (PARTITION BY test_plan_id ORDER BY run_date DESC) as run_rank
+        FROM test_run_trend
+        WHERE test_plan_id IN ({', '.join(['%s'] * len(test_plan_ids))})
+            AND run_date < %s
+    )
+    SELECT {columns}
+    FROM ranked_trend
+    WHERE run_rank <= %s;
+    """
+        params = list(test_plan_ids) + [before_date, limit]
+    for row in execute_query(connection, query, params, TrendRow, name='get_trend_history'):
+        history[row.test_plan_id].append(row)
+    for rows in history.values():
+        rows.sort(key=lambda row: str(row.run_date))
+    return history
+
+def get_status_totals(overall_summary):
+    """Get the total test count and the count of every summary column in one pass"""
+    totals = new_status_counter()
+    for item in overall_summary:
+        totals['total_tests'] += item.count
+        column = STATUS_COLUMNS.get(item.test_case_status)
+        if column:
+            totals[column] += item.count
+    return totals
+
 def generate_notable_findings(overall_summary, squad_summary, feature_summary, epic_summary):
     """Generate notable findings and analysis"""
     findings = []
     
     # Calculate totals
-    total_tests = sum(item['count'] for item in overall_summary)
-    passed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'passed'), 0)
-    failed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'failed'), 0)
-    blocked = next((item['count'] for item in overall_summary if item['test_case_status'] == 'blocked'), 0)
-    app_bug = next((item['count'] for item in overall_summary if item['test_case_status'] == 'application_bug'), 0)
-    not_implemented = next((item['count'] for item in overall_summary if item['test_case_status'] == 'not_implemented'), 0)
+    totals = get_status_totals(overall_summary)
+    total_tests = totals['total_tests']
+    failed = totals['failed']
+    blocked = totals['blocked']
+    app_bug = totals['app_bug']
+    not_implemented = totals['not_implemented']
     
-    overall_pass_rate = round((passed / total_tests * 100), 1) if total_tests > 0 else 0
+    overall_pass_rate = round((totals['passed'] / total_tests * 100), 1) if total_tests > 0 else 0
+
+    squads = squad_summary if isinstance(squad_summary, SummaryTable) else SummaryTable(squad_summary)
+    features = feature_summary if isinstance(feature_summary, SummaryTable) else SummaryTable(feature_summary)
+    epics = epic_summary if isinstance(epic_summary, SummaryTable) else SummaryTable(epic_summary)
     
     # Overall health finding
     if overall_pass_rate >= 95:
@@ -369,11 +2255,11 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
         })
     
     # Squad performance findings
-    top_squads = sorted(squad_summary, key=lambda x: float(x['success_rate']), reverse=True)[:3]
-    bottom_squads = [s for s in squad_summary if float(s['success_rate']) < 95 and s['total_tests'] > 5]
+    top_squads = squads.top('success_rate', 3)
+    bottom_squads = squads.select(squads.compare('success_rate', lt, 95), squads.compare('total_tests', gt, 5))
     
     if top_squads:
-        top_squad_names = ', '.join([s['squad'] for s in top_squads[:3]])
+        top_squad_names = ', '.join([s.squad for s in top_squads])
         findings.append({
             'type': 'success',
             'title': 'Top Performing Squads',
@@ -383,34 +2269,34 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
     if bottom_squads:
         for squad in bottom_squads:
             issues = []
-            if int(squad['app_bug']) > 0:
-                issues.append(f"{squad['app_bug']} application bugs")
-            if int(squad['not_implemented']) > 0:
-                issues.append(f"{squad['not_implemented']} not implemented")
-            if int(squad['failed']) > 0:
-                issues.append(f"{squad['failed']} failures")
+            if squad.app_bug > 0:
+                issues.append(f"{squad.app_bug} application bugs")
+            if squad.not_implemented > 0:
+                issues.append(f"{squad.not_implemented} not implemented")
+            if squad.failed > 0:
+                issues.append(f"{squad.failed} failures")
             
             if issues:
                 findings.append({
                     'type': 'warning',
-                    'title': f'{squad["squad"]} Needs Attention',
-                    'description': f'Success rate of {squad["success_rate"]}% with {" and ".join(issues)}. Consider prioritizing bug fixes and test implementation.'
+                    'title': f'{squad.squad} Needs Attention',
+                    'description': f'Success rate of {squad.success_rate}% with {" and ".join(issues)}. Consider prioritizing bug fixes and test implementation.'
                 })
     
     # Feature-specific findings
-    critical_features = [f for f in feature_summary if float(f['success_rate']) < 80 and f['total_tests'] > 10]
-    perfect_features = [f for f in feature_summary if float(f['success_rate']) == 100 and f['total_tests'] > 50]
+    critical_features = features.select(features.compare('success_rate', lt, 80), features.compare('total_tests', gt, 10))
+    perfect_features = features.select(features.compare('success_rate', eq, 100), features.compare('total_tests', gt, 50))
     
     if critical_features:
         for feature in critical_features:
             findings.append({
                 'type': 'danger',
-                'title': f'Critical: {feature["feature"]}',
-                'description': f'Only {feature["success_rate"]}% pass rate with {feature["total_tests"]} tests. This feature requires immediate attention.'
+                'title': f'Critical: {feature.feature}',
+                'description': f'Only {feature.success_rate}% pass rate with {feature.total_tests} tests. This feature requires immediate attention.'
             })
     
     if perfect_features:
-        feature_names = ', '.join([f['feature'] for f in perfect_features[:3]])
+        feature_names = ', '.join([f.feature for f in perfect_features[:3]])
         findings.append({
             'type': 'success',
             'title': 'Highly Stable Features',
@@ -418,15 +2304,16 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
         })
     
     # EPIC findings
-    problematic_epics = [e for e in epic_summary if float(e['success_rate']) < 90 and e['epic_id'] != 'No EPIC']
-    unassigned_count = next((e['total_tests'] for e in epic_summary if e['epic_id'] == 'No EPIC'), 0)
+    problematic_epics = epics.select(epics.compare('success_rate', lt, 90), epics.compare('epic_id', ne, 'No EPIC'))
+    epic_ids = epics.column('epic_id')
+    unassigned_count = epics.column('total_tests')[epic_ids.index('No EPIC')] if 'No EPIC' in epic_ids else 0
     
     if problematic_epics:
         for epic in problematic_epics[:3]:  # Top 3 problematic EPICs
             findings.append({
                 'type': 'danger',
-                'title': f'EPIC {epic["epic_id"]} Issues',
-                'description': f'{epic["epic_title"][:50]}... has {epic["success_rate"]}% pass rate. Review and address {int(epic["app_bug"]) + int(epic["not_implemented"])} issues.'
+                'title': f'EPIC {epic.epic_id} Issues',
+                'description': f'{epic.epic_title[:50]}... has {epic.success_rate}% pass rate. Review and address {epic.app_bug + epic.not_implemented} issues.'
             })
     
     if unassigned_count > 100:
@@ -437,19 +2324,20 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
         })
     
     # Test distribution finding
-    largest_feature = max(feature_summary, key=lambda x: x['total_tests'])
-    if largest_feature['total_tests'] > total_tests * 0.3:
+    feature_totals = features.column('total_tests')
+    largest_feature = features[feature_totals.index(max(feature_totals))]
+    if largest_feature.total_tests > total_tests * 0.3:
         findings.append({
             'type': 'info',
             'title': 'Test Distribution Imbalance',
-            'description': f'{largest_feature["feature"]} contains {round(largest_feature["total_tests"]/total_tests*100, 1)}% of all tests. Consider if this reflects actual feature complexity or indicates need for test redistribution.'
+            'description': f'{largest_feature.feature} contains {round(largest_feature.total_tests/total_tests*100, 1)}% of all tests. Consider if this reflects actual feature complexity or indicates need for test redistribution.'
         })
     
     # Application bug concentration
     if app_bug > 0:
-        bug_features = [f for f in feature_summary if int(f['app_bug']) > 0]
+        bug_features = features.nonzero('app_bug')
         if bug_features:
-            bug_feature_names = ', '.join([f'{f["feature"]} ({f["app_bug"]} bugs)' for f in bug_features[:3]])
+            bug_feature_names = ', '.join([f'{f.feature} ({f.app_bug} bugs)' for f in bug_features[:3]])
             findings.append({
                 'type': 'warning',
                 'title': 'Application Bugs Concentration',
@@ -458,17 +2346,17 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
     
     # Not implemented tests
     if not_implemented > 0:
-        ni_features = [f for f in feature_summary if int(f['not_implemented']) > 0]
+        ni_features = features.nonzero('not_implemented')
         if ni_features:
             findings.append({
                 'type': 'info',
                 'title': 'Pending Test Implementation',
-                'description': f'{not_implemented} tests are marked as not implemented, primarily in {", ".join([f["feature"] for f in ni_features])}.'
+                'description': f'{not_implemented} tests are marked as not implemented, primarily in {", ".join([f.feature for f in ni_features])}.'
             })
     
     # Test automation analysis
-    total_squads = len(squad_summary)
-    perfect_squads = len([s for s in squad_summary if float(s['success_rate']) == 100])
+    total_squads = len(squads)
+    perfect_squads = squads.column('success_rate').count(100)
     if perfect_squads > total_squads * 0.7:
         findings.append({
             'type': 'success',
@@ -477,13 +2365,13 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
         })
     
     # Feature complexity analysis
-    avg_tests_per_feature = total_tests / len(feature_summary) if feature_summary else 0
-    complex_features = [f for f in feature_summary if f['total_tests'] > avg_tests_per_feature * 2]
+    avg_tests_per_feature = total_tests / len(features) if len(features) else 0
+    complex_features = features.select(features.compare('total_tests', gt, avg_tests_per_feature * 2))
     if complex_features:
         findings.append({
             'type': 'info',
             'title': 'High Complexity Features',
-            'description': f'{len(complex_features)} features have significantly higher test counts than average ({round(avg_tests_per_feature, 1)}), indicating higher complexity: {", ".join([f["feature"] for f in complex_features[:3]])}.'
+            'description': f'{len(complex_features)} features have significantly higher test counts than average ({round(avg_tests_per_feature, 1)}), indicating higher complexity: {", ".join([f.feature for f in complex_features[:3]])}.'
         })
     
     # Test execution trend
@@ -503,220 +2391,84 @@ def generate_notable_findings(overall_summary, squad_summary, feature_summary, e
     
     return findings
 
-def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_summary, 
-                        feature_breakdown, epic_summary):
-    """Generate the HTML report with navigation menu"""
-    
-    # Calculate totals
-    total_tests = sum(item['count'] for item in overall_summary)
-    passed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'passed'), 0)
-    failed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'failed'), 0)
-    blocked = next((item['count'] for item in overall_summary if item['test_case_status'] == 'blocked'), 0)
-    app_bug = next((item['count'] for item in overall_summary if item['test_case_status'] == 'application_bug'), 0)
-    not_implemented = next((item['count'] for item in overall_summary if item['test_case_status'] == 'not_implemented'), 0)
-    
-    # Generate notable findings
-    notable_findings = generate_notable_findings(overall_summary, squad_summary, feature_summary, epic_summary)
-    
-    # Generate findings HTML
-    findings_html = ""
-    for finding in notable_findings:
-        icon = "✓" if finding['type'] == 'success' else "⚠" if finding['type'] == 'warning' else "✗" if finding['type'] == 'danger' else "ℹ"
-        findings_html += f"""
-            <div class="finding finding-{finding['type']}">
-                <div class="finding-icon">{icon}</div>
-                <div class="finding-content">
-                    <h3 class="finding-title">{finding['title']}</h3>
-                    <p class="finding-description">{finding['description']}</p>
-                </div>
-            </div>
-        """
-    
-    # Current date
-    current_date = datetime.now().strftime("%B %d, %Y")
-    
-    # Generate KPI cards
-    kpi_cards = f"""
+# Report layout templates; ${name} slots are filled by CompiledTemplate.render()
+REPORT_TEMPLATES = {
+    'kpi_cards': """
         <div class="kpi-container">
             <div class="kpi-card passed">
                 <p class="kpi-title">Passed</p>
-                <p class="kpi-value">{passed}</p>
-                <p class="kpi-percentage">{round(passed/total_tests*100, 1) if total_tests > 0 else 0}% of total</p>
+                <p class="kpi-value">${passed}</p>
+                <p class="kpi-percentage">${passed_percentage}% of total</p>
                 <div class="kpi-indicator"></div>
             </div>
             
             <div class="kpi-card failed">
                 <p class="kpi-title">Failed</p>
-                <p class="kpi-value">{failed}</p>
-                <p class="kpi-percentage">{round(failed/total_tests*100, 1) if total_tests > 0 else 0}% of total</p>
+                <p class="kpi-value">${failed}</p>
+                <p class="kpi-percentage">${failed_percentage}% of total</p>
                 <div class="kpi-indicator"></div>
             </div>
             
             <div class="kpi-card blocked">
                 <p class="kpi-title">Blocked</p>
-                <p class="kpi-value">{blocked}</p>
-                <p class="kpi-percentage">{round(blocked/total_tests*100, 1) if total_tests > 0 else 0}% of total</p>
+                <p class="kpi-value">${blocked}</p>
+                <p class="kpi-percentage">${blocked_percentage}% of total</p>
                 <div class="kpi-indicator"></div>
             </div>
             
             <div class="kpi-card bug">
                 <p class="kpi-title">Application Bug</p>
-                <p class="kpi-value">{app_bug}</p>
-                <p class="kpi-percentage">{round(app_bug/total_tests*100, 1) if total_tests > 0 else 0}% of total</p>
+                <p class="kpi-value">${app_bug}</p>
+                <p class="kpi-percentage">${app_bug_percentage}% of total</p>
                 <div class="kpi-indicator"></div>
             </div>
             
             <div class="kpi-card not-implemented">
                 <p class="kpi-title">Not Implemented</p>
-                <p class="kpi-value">{not_implemented}</p>
-                <p class="kpi-percentage">{round(not_implemented/total_tests*100, 1) if total_tests > 0 else 0}% of total</p>
+                <p class="kpi-value">${not_implemented}</p>
+                <p class="kpi-percentage">${not_implemented_percentage}% of total</p>
                 <div class="kpi-indicator"></div>
             </div>
         </div>
-    """
-    
-    # Generate squad performance table
-    squad_rows = ""
-    for squad in squad_summary:
-        squad_icon_class = get_squad_icon_class(squad['squad'])
-        squad_initial = get_squad_initial(squad['squad'])
-        health_class = get_health_class(float(squad['success_rate']))
-        
-        squad_rows += f"""
-            <tr>
-                <td class="squad-column">
-                    <span class="squad-icon {squad_icon_class}">{squad_initial}</span>
-                    {squad['squad']}
-                </td>
-                <td>{squad['total_tests']}</td>
-                <td>{squad['passed']}</td>
-                <td>{squad['failed']}</td>
-                <td>{squad['blocked']}</td>
-                <td>{squad['app_bug']}</td>
-                <td>{squad['not_implemented']}</td>
-                <td>{squad['success_rate']}%</td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-value {health_class}" style="width: {squad['success_rate']}%"></div>
-                    </div>
-                </td>
-            </tr>
-        """
-    
-    # Generate feature health table
-    feature_rows = ""
-    for feature in feature_summary:
-        health_class = get_health_class(float(feature['success_rate']))
+    """,
+    'trend_nav': """                <li><a href="#trend">Trend</a></li>
+""",
+    'trend_section': """
         
-        feature_rows += f"""
-            <tr>
-                <td>{feature['feature']}</td>
-                <td>{feature['total_tests']}</td>
-                <td>{feature['passed']}</td>
-                <td>{feature['failed']}</td>
-                <td>{feature['blocked']}</td>
-                <td>{feature['app_bug']}</td>
-                <td>{feature['not_implemented']}</td>
-                <td>{feature['success_rate']}%</td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-value {health_class}" style="width: {feature['success_rate']}%"></div>
-                    </div>
-                </td>
-            </tr>
-        """
-    
-    # Generate feature breakdown table
-    breakdown_rows = ""
-    current_feature = None
-    feature_totals = defaultdict(int)
-    
-    # Calculate totals per feature
-    for item in feature_breakdown:
-        feature_totals[item['feature']] += item['count']
-    
-    for item in feature_breakdown:
-        if current_feature != item['feature']:
-            current_feature = item['feature']
-            breakdown_rows += f"""
-                <tr class="feature-header">
-                    <td colspan="4">{item['feature']} ({feature_totals[item['feature']]} total)</td>
-                </tr>
-            """
-        
-        squad_icon_class = get_squad_icon_class(item['squad'])
-        squad_initial = get_squad_initial(item['squad'])
-        status_class = f"status-{item['test_case_status'].replace('_', '-')}"
-        status_display = get_status_display(item['test_case_status'])
-        
-        breakdown_rows += f"""
-            <tr>
-                <td>{item['feature']}</td>
-                <td class="squad-column">
-                    <span class="squad-icon {squad_icon_class}">{squad_initial}</span>
-                    {item['squad']}
-                </td>
-                <td><span class="status {status_class}">{status_display}</span></td>
-                <td>{item['count']}</td>
-            </tr>
-        """
-    
-    # Generate EPIC-wise stability table
-    epic_rows = ""
-    for epic in epic_summary:
-        health_class = get_health_class(float(epic['success_rate']))
-        
-        # Special formatting for certain rows
-        row_style = ""
-        epic_id_style = ""
-        if epic['epic_id'] == 'No EPIC':
-            row_style = 'style="background-color: #f0f0f0;"'
-            epic_id_style = 'style="background-color: #ddd;"'
-        elif float(epic['success_rate']) == 0:
-            row_style = 'style="background-color: #ffe6e6;"'
-        
-        epic_title_display = epic['epic_title']
-        if epic['epic_id'] == 'No EPIC':
-            epic_title_display = f"<em>{epic['epic_title']}</em>"
-        
-        epic_rows += f"""
-            <tr {row_style}>
-                <td><span class="epic-id" {epic_id_style}>{epic['epic_id']}</span></td>
-                <td>{epic_title_display}</td>
-                <td>{epic['total_tests']}</td>
-                <td>{epic['passed']}</td>
-                <td>{epic['failed']}</td>
-                <td>{epic['blocked']}</td>
-                <td>{epic['app_bug']}</td>
-                <td>{epic['not_implemented']}</td>
-                <td>{epic['success_rate']}%</td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-value {health_class}" style="width: {epic['success_rate']}%"></div>
-                    </div>
-                </td>
-            </tr>
-        """
-    
-    # HTML template
-    html = f"""<!DOCTYPE html>
+        <div class="section" id="trend">
+            <h2 class="section-title">Trend</h2>
+            <p style="margin-bottom: 20px;">Latest-run status counts of the last ${run_count} runs, from ${first_date} to ${last_date}:</p>
+            <div class="sparkline-container">
+                ${sparklines}
+            </div>
+            <div class="trend-chart-container">
+                <div class="trend-chart-scale">${max_total}</div>
+                ${area_chart}
+                <div class="trend-chart-axis"><span>${first_date}</span><span>${last_date}</span></div>
+            </div>
+        </div>""",
+    'trend_sparkline': """
+                <div class="sparkline-card">
+                    <p class="sparkline-title">${title}</p>
+                    <p class="sparkline-value">${value} <span class="sparkline-change">${change}</span></p>
+                    ${sparkline}
+                </div>""",
+    'page_start': """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>1P Test Cases Stability Dashboard</title>
-    <style>
-        {get_css_styles()}
-    </style>
+    <title>${report_title}</title>
+    ${style_block}
 </head>
 <body>
     <!-- Navigation Menu -->
     <nav class="nav-menu">
         <div class="nav-container">
-            <div class="nav-brand">1P Test Dashboard</div>
+            <div class="nav-brand">${nav_brand}</div>
             <ul class="nav-links">
                 <li><a href="#overview">Overview</a></li>
-                <li><a href="#findings">Key Findings</a></li>
+${trend_nav}                <li><a href="#findings">Key Findings</a></li>
                 <li><a href="#squad-performance">Squad Performance</a></li>
                 <li><a href="#feature-health">Feature Health</a></li>
                 <li><a href="#feature-breakdown">Feature Breakdown</a></li>
@@ -730,24 +2482,34 @@ def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_s
     
     <div class="container" style="padding-top: 80px;">
         <header id="overview">
-            <h1>1P Test Cases Stability Dashboard</h1>
-            <p>Detailed quality metrics for 1P features from the latest test execution</p>
+            <h1>${report_title}</h1>
+            <p>Detailed quality metrics for ${scope_description} from the latest test execution</p>
             
             <div class="header-details">
-                <div class="test-plan-info">Test Plan ID: {test_plan_id}</div>
-                <div class="test-plan-info">Total Test Cases: {total_tests}</div>
+                <div class="test-plan-info">Test Plan ID: ${test_plan_id}</div>
+                <div class="test-plan-info">Total Test Cases: ${total_tests}</div>
             </div>
             
-            <p class="timestamp">Last updated: {current_date}</p>
+            <p class="timestamp">Last updated: ${current_date}</p>
         </header>
         
-        {kpi_cards}
+        ${kpi_cards}${trend_section}
         
         <div class="section" id="findings">
             <h2 class="section-title">Notable Findings and Analysis</h2>
             <p style="margin-bottom: 20px;">Key insights and recommendations based on test execution results:</p>
             <div class="findings-container">
-                {findings_html}
+                """,
+    'finding': """
+            <div class="finding finding-${type}">
+                <div class="finding-icon">${icon}</div>
+                <div class="finding-content">
+                    <h3 class="finding-title">${title}</h3>
+                    <p class="finding-description">${description}</p>
+                </div>
+            </div>
+        """,
+    'squad_section': """
             </div>
         </div>
         
@@ -768,7 +2530,28 @@ def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_s
                     </tr>
                 </thead>
                 <tbody>
-                    {squad_rows}
+                    """,
+    'squad_row': """
+            <tr>
+                <td class="squad-column">
+                    ${squad_icon}
+                    ${squad}
+                </td>
+                <td>${total_tests}</td>
+                <td>${passed}</td>
+                <td>${failed}</td>
+                <td>${blocked}</td>
+                <td>${app_bug}</td>
+                <td>${not_implemented}</td>
+                <td>${success_rate}%</td>
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-value ${health_class}" style="width: ${success_rate}%"></div>
+                    </div>
+                </td>
+            </tr>
+        """,
+    'feature_section': """
                 </tbody>
             </table>
         </div>
@@ -790,7 +2573,25 @@ def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_s
                     </tr>
                 </thead>
                 <tbody>
-                    {feature_rows}
+                    """,
+    'feature_row': """
+            <tr>
+                <td>${feature}</td>
+                <td>${total_tests}</td>
+                <td>${passed}</td>
+                <td>${failed}</td>
+                <td>${blocked}</td>
+                <td>${app_bug}</td>
+                <td>${not_implemented}</td>
+                <td>${success_rate}%</td>
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-value ${health_class}" style="width: ${success_rate}%"></div>
+                    </div>
+                </td>
+            </tr>
+        """,
+    'breakdown_section': """
                 </tbody>
             </table>
         </div>
@@ -800,14 +2601,59 @@ def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_s
             <table>
                 <thead>
                     <tr>
-                        <th>1P Feature</th>
+                        <th>${feature_heading}</th>
+                        <th>Squad</th>
+                        <th>Status</th>
+                        <th>Count</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    """,
+    'breakdown_data_section': """
+                </tbody>
+            </table>
+        </div>
+        
+        <div class="section" id="feature-breakdown">
+            <h2 class="section-title">Detailed Breakdown by Feature</h2>
+            <style>${breakdown_styles}</style>
+            ${breakdown_data}
+            <script>${breakdown_script}</script>
+            <div class="breakdown-controls">
+                <label>Squad <select id="breakdown-squad"><option value="">All squads</option></select></label>
+                <label>Status <select id="breakdown-status"><option value="">All statuses</option></select></label>
+                <button type="button" id="breakdown-prev">Previous</button>
+                <span id="breakdown-page">Loading breakdown...</span>
+                <button type="button" id="breakdown-next">Next</button>
+            </div>
+            <table id="breakdown-table">
+                <thead>
+                    <tr>
+                        <th>${feature_heading}</th>
                         <th>Squad</th>
                         <th>Status</th>
                         <th>Count</th>
                     </tr>
                 </thead>
                 <tbody>
-                    {breakdown_rows}
+                    """,
+    'breakdown_feature_header': """
+                <tr class="feature-header">
+                    <td colspan="4">${feature} (${feature_total} total)</td>
+                </tr>
+            """,
+    'breakdown_row': """
+            <tr>
+                <td>${feature}</td>
+                <td class="squad-column">
+                    ${squad_icon}
+                    ${squad}
+                </td>
+                <td>${status_badge}</td>
+                <td>${count}</td>
+            </tr>
+        """,
+    'epic_section': """
                 </tbody>
             </table>
         </div>
@@ -831,76 +2677,594 @@ def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_s
                     </tr>
                 </thead>
                 <tbody>
-                    {epic_rows}
+                    """,
+    'epic_row': """
+            <tr ${row_style}>
+                <td><span class="epic-id" ${epic_id_style}>${epic_id}</span></td>
+                <td>${epic_title_display}</td>
+                <td>${total_tests}</td>
+                <td>${passed}</td>
+                <td>${failed}</td>
+                <td>${blocked}</td>
+                <td>${app_bug}</td>
+                <td>${not_implemented}</td>
+                <td>${success_rate}%</td>
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-value ${health_class}" style="width: ${success_rate}%"></div>
+                    </div>
+                </td>
+            </tr>
+        """,
+    'page_end': """
                 </tbody>
             </table>
         </div>
         
         <footer>
-            <p>Generated on {current_date} | Test Plan ID: {test_plan_id} | 1P Features Test Execution Report</p>
+            <p>Generated on ${current_date} | Test Plan ID: ${test_plan_id} | ${footer_title}</p>
             <p>© 2025 Quality Metrics Dashboard. All rights reserved.</p>
         </footer>
     </div>
     
-    <script>
-        // Smooth scrolling for navigation links
-        document.querySelectorAll('a[href^="#"]').forEach(anchor => {{
-            anchor.addEventListener('click', function (e) {{
-                e.preventDefault();
-                const target = document.querySelector(this.getAttribute('href'));
-                if (target) {{
-                    target.scrollIntoView({{
-                        behavior: 'smooth',
-                        block: 'start'
-                    }});
-                }}
-            }});
-        }});
-        
-        // Back to top button functionality
-        const backToTopBtn = document.getElementById('backToTop');
+    ${script_block}
+</body>
+</html>"""
+}
+
+class CompiledTemplate:
+    """Report template parsed once into a generated render function
+
+    Slots named in record_fields are read from the record passed as the
+    first argument: by attribute when record_fields is a row type such as
+    SquadSummaryRow, by key from a dict otherwise. Every other ${name}
+    slot becomes a keyword argument. Rendering a row is then one call with no re-parsing
+    of the layout and no per-row dict merging.
+    """
+
+    SLOT_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+    def __init__(self, source, name='template', record_fields=()):
+        self.source = source
+        self.name = name
+        pieces = self.SLOT_PATTERN.split(source)
+        attributes = hasattr(record_fields, '_fields')
+        if attributes:
+            record_fields = record_fields._fields
+        self.fields = tuple(dict.fromkeys(pieces[1::2]))
+        self.record_fields = tuple(field for field in self.fields if field in record_fields)
+
+        # Compile to adjacent f-string literals, which Python joins into a
+        # single string build, so a render costs the same as an inline f-string
+        parts = []
+        for index, piece in enumerate(pieces):
+            if index % 2:
+                if piece not in self.record_fields:
+                    value = piece
+                elif attributes:
+                    value = f"record.{piece}"
+                else:
+                    value = f"record[{piece!r}]"
+                parts.append(f'f"{{{value}}}"')
+            elif piece:
+                parts.append('f' + repr(piece.replace('{', '{{').replace('}', '}}')))
+        arguments = ['record'] if record_fields else []
+        arguments += [field for field in self.fields if field not in self.record_fields]
+        code = (
+            f"def render({''.join(argument + ', ' for argument in arguments)}**unused):\n"
+            f"    return ({' '.join(parts) or repr('')})\n"
+        )
+        namespace = {}
+        exec(compile(code, f"<template {name}>", 'exec'), namespace)
+        self.render = namespace['render']
+
+# Fields of a finding, read straight from it by the finding template
+FINDING_FIELDS = ('type', 'title', 'description')
+
+# Labels of a report scope, read straight from its REPORT_SCOPES entry
+SCOPE_LABEL_FIELDS = ('report_title', 'nav_brand', 'scope_description', 'feature_heading', 'footer_title')
+
+@lru_cache(maxsize=None)
+def get_template(name, record_fields=()):
+    """Compile a report template on first use and reuse it for every later render"""
+    return CompiledTemplate(REPORT_TEMPLATES[name], name, record_fields)
+
+def iter_html_report(test_plan_id, overall_summary, squad_summary, feature_summary,
+                     feature_breakdown, epic_summary, assets=None, trend_history=None,
+                     scope=DEFAULT_REPORT_SCOPE, breakdown_source=None):
+    """Yield the HTML report section by section, one table row at a time
+
+    assets maps 'css' and 'js' to shared asset files to link to; without
+    it the stylesheet and script are inlined into the page. trend_history
+    lists the plan's saved trend rows before today, oldest first; without
+    it the trend section is left out. scope picks the page's labels.
+    breakdown_source selects the client-side breakdown table: 'inline'
+    embeds its JSON data, any other value names the data file to load;
+    without it the breakdown is written as table rows.
+    """
+    mark_render_section('page_start')
+    labels = get_report_scope(scope)
+
+    # Calculate totals
+    totals = get_status_totals(overall_summary)
+    total_tests = totals['total_tests']
+    passed = totals['passed']
+    failed = totals['failed']
+    blocked = totals['blocked']
+    app_bug = totals['app_bug']
+    not_implemented = totals['not_implemented']
+    
+    # Generate notable findings
+    notable_findings = generate_notable_findings(overall_summary, squad_summary, feature_summary, epic_summary)
+    
+    # Current date
+    current_date = datetime.now().strftime("%B %d, %Y")
+    
+    # Generate KPI cards
+    kpi_values = {
+        'passed': passed,
+        'failed': failed,
+        'blocked': blocked,
+        'app_bug': app_bug,
+        'not_implemented': not_implemented
+    }
+    for name, value in list(kpi_values.items()):
+        kpi_values[f"{name}_percentage"] = round(value/total_tests*100, 1) if total_tests > 0 else 0
+    kpi_cards = get_template('kpi_cards').render(**kpi_values)
+
+    if assets:
+        style_block = f'<link rel="stylesheet" href="{assets["css"]}">'
+        script_block = f'<script src="{assets["js"]}"></script>'
+    else:
+        style_block = f"<style>\n        {get_css_styles()}\n    </style>"
+        script_block = f"<script>{get_js_script()}</script>"
+
+    trend_nav = trend_section = ''
+    if trend_history is not None:
+        trend_nav = get_template('trend_nav').render()
+        trend_section = render_trend_section(
+            trend_history,
+            (passed, failed, blocked, app_bug, not_implemented),
+            datetime.now().strftime('%Y-%m-%d')
+        )
+
+    yield get_template('page_start', SCOPE_LABEL_FIELDS).render(
+        labels,
+        style_block=style_block,
+        trend_nav=trend_nav,
+        test_plan_id=test_plan_id,
+        total_tests=total_tests,
+        current_date=current_date,
+        kpi_cards=kpi_cards,
+        trend_section=trend_section
+    )
+
+    # Generate findings HTML
+    mark_render_section('findings')
+    finding_template = get_template('finding', FINDING_FIELDS)
+    for finding in notable_findings:
+        icon = "✓" if finding['type'] == 'success' else "⚠" if finding['type'] == 'warning' else "✗" if finding['type'] == 'danger' else "ℹ"
+        yield finding_template.render(finding, icon=icon)
+
+    mark_render_section('squad_summary')
+    yield get_template('squad_section').render()
+
+    # Generate squad performance table
+    squad_icons = _squad_registry.icon_html
+    squad_row = get_template('squad_row', SquadSummaryRow)
+    for squad in squad_summary:
+        yield squad_row.render(
+            squad,
+            squad_icon=squad_icons[squad.squad],
+            health_class=get_health_class(squad.success_rate)
+        )
+
+    mark_render_section('feature_summary')
+    yield get_template('feature_section').render()
+
+    # Generate feature health table
+    feature_row = get_template('feature_row', FeatureSummaryRow)
+    for feature in feature_summary:
+        yield feature_row.render(
+            feature,
+            health_class=get_health_class(feature.success_rate)
+        )
+
+    mark_render_section('feature_breakdown')
+    if breakdown_source:
+        if breakdown_source == 'inline':
+            breakdown_data = (
+                f'<script type="application/json" id="breakdown-data">{get_breakdown_json(feature_breakdown)}</script>'
+            )
+        else:
+            breakdown_data = f'<script src="{breakdown_source}" defer></script>'
+        yield get_template('breakdown_data_section', SCOPE_LABEL_FIELDS).render(
+            labels, breakdown_data=breakdown_data,
+            breakdown_styles=get_breakdown_styles(), breakdown_script=get_breakdown_script()
+        )
+        # The page draws the rows from the data, so none are written here
+        feature_breakdown = ()
+    else:
+        yield get_template('breakdown_section', SCOPE_LABEL_FIELDS).render(labels)
+
+    # Generate feature breakdown table
+    feature_header = get_template('breakdown_feature_header')
+    breakdown_row = get_template('breakdown_row', BreakdownRow)
+    status_badges = _squad_registry.status_html
+    current_feature = None
+    feature_totals = defaultdict(int)
+    
+    # Calculate totals per feature
+    for item in feature_breakdown:
+        feature_totals[item.feature] += item.count
+    
+    for item in feature_breakdown:
+        if current_feature != item.feature:
+            current_feature = item.feature
+            yield feature_header.render(
+                feature=item.feature,
+                feature_total=feature_totals[item.feature]
+            )
         
-        window.addEventListener('scroll', () => {{
-            if (window.pageYOffset > 300) {{
-                backToTopBtn.style.display = 'block';
-            }} else {{
-                backToTopBtn.style.display = 'none';
-            }}
-        }});
+        yield breakdown_row.render(
+            item,
+            squad_icon=squad_icons[item.squad],
+            status_badge=status_badges[item.test_case_status]
+        )
+
+    mark_render_section('epic_summary')
+    yield get_template('epic_section').render()
+
+    # Generate EPIC-wise stability table
+    epic_row = get_template('epic_row', EpicSummaryRow)
+    for epic in epic_summary:
+        health_class = get_health_class(epic.success_rate)
         
-        backToTopBtn.addEventListener('click', () => {{
-            window.scrollTo({{
-                top: 0,
-                behavior: 'smooth'
-            }});
-        }});
+        # Special formatting for certain rows
+        row_style = ""
+        epic_id_style = ""
+        if epic.epic_id == 'No EPIC':
+            row_style = 'style="background-color: #f0f0f0;"'
+            epic_id_style = 'style="background-color: #ddd;"'
+        elif epic.success_rate == 0:
+            row_style = 'style="background-color: #ffe6e6;"'
         
-        // Highlight active section in navigation
-        const sections = document.querySelectorAll('.section, header');
-        const navLinks = document.querySelectorAll('.nav-links a');
+        epic_title_display = epic.epic_title
+        if epic.epic_id == 'No EPIC':
+            epic_title_display = f"<em>{epic.epic_title}</em>"
         
-        window.addEventListener('scroll', () => {{
-            let current = '';
-            sections.forEach(section => {{
-                const sectionTop = section.offsetTop;
-                const sectionHeight = section.clientHeight;
-                if (pageYOffset >= sectionTop - 100) {{
-                    current = section.getAttribute('id');
-                }}
-            }});
-            
-            navLinks.forEach(link => {{
-                link.classList.remove('active');
-                if (link.getAttribute('href') === '#' + current) {{
-                    link.classList.add('active');
-                }}
-            }});
-        }});
-    </script>
-</body>
-</html>"""
-    
-    return html
+        yield epic_row.render(
+            epic,
+            health_class=health_class,
+            row_style=row_style,
+            epic_id_style=epic_id_style,
+            epic_title_display=epic_title_display
+        )
+
+    mark_render_section('page_end')
+    yield get_template('page_end', SCOPE_LABEL_FIELDS).render(
+        labels,
+        current_date=current_date,
+        test_plan_id=test_plan_id,
+        script_block=script_block
+    )
+
+def generate_html_report(test_plan_id, overall_summary, squad_summary, feature_summary, 
+                        feature_breakdown, epic_summary, assets=None, trend_history=None,
+                        scope=DEFAULT_REPORT_SCOPE, breakdown_source=None):
+    """Generate the HTML report with navigation menu"""
+    return ''.join(iter_html_report(
+        test_plan_id,
+        overall_summary,
+        squad_summary,
+        feature_summary,
+        feature_breakdown,
+        epic_summary,
+        assets,
+        trend_history,
+        scope,
+        breakdown_source
+    ))
+
+# How the detailed breakdown reaches the page: as server-rendered table
+# rows, or as JSON inlined into the page or written to a data file next
+# to it and drawn by the page one page of rows at a time
+BREAKDOWN_MODES = ('table', 'inline', 'external')
+# Rows the client-side breakdown table draws per page
+BREAKDOWN_PAGE_SIZE = 100
+
+# Characters the breakdown JSON escapes, as they would end or break the script holding it
+BREAKDOWN_JSON_ESCAPES = str.maketrans({'<': '\\u003c', '\u2028': '\\u2028', '\u2029': '\\u2029'})
+
+def get_breakdown_json(feature_breakdown):
+    """Pack the breakdown as compact JSON for the client-side table
+
+    Features, squads and statuses are listed once each, with the squad
+    icon and status badge HTML, and every row refers to them by index.
+    """
+    features, squads, statuses = {}, {}, {}
+    rows = [
+        (
+            features.setdefault(item.feature, len(features)),
+            squads.setdefault(item.squad, len(squads)),
+            statuses.setdefault(item.test_case_status, len(statuses)),
+            item.count
+        )
+        for item in feature_breakdown
+    ]
+    data = {
+        'pageSize': BREAKDOWN_PAGE_SIZE,
+        'features': list(features),
+        'squads': [(squad, _squad_registry.icon_html[squad]) for squad in squads],
+        'statuses': [
+            (_squad_registry.get_status_display(status), _squad_registry.status_html[status])
+            for status in statuses
+        ],
+        'rows': rows
+    }
+    # Escape every '<' so a name can never close or open markup around the
+    # data, and the line separators older JavaScript parsers reject in strings
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).translate(BREAKDOWN_JSON_ESCAPES)
+
+def get_breakdown_filename(filename):
+    """Get the name of the breakdown data file written next to a report"""
+    return f"{os.path.splitext(filename)[0]}.breakdown.js"
+
+def write_breakdown_data(feature_breakdown, filename):
+    """Write a report's breakdown data file and return its name relative to the report
+
+    The data is wrapped in a script rather than served as bare JSON, so
+    reports opened straight from disk can load it too.
+    """
+    path = get_breakdown_filename(filename)
+    # Write under a temporary name so a report being viewed never loads a partial file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(f"window.breakdownData = {get_breakdown_json(feature_breakdown)};\n")
+    os.replace(temp_path, path)
+    return os.path.basename(path)
+
+def get_breakdown_source(breakdown_mode, feature_breakdown, filename):
+    """Get the breakdown_source of a report, writing its data file in external mode"""
+    if breakdown_mode == 'table':
+        return None
+    if breakdown_mode == 'inline':
+        return 'inline'
+    return write_breakdown_data(feature_breakdown, filename)
+
+# Sizes of the inline SVG trend charts, in viewBox units
+TREND_CHART_SIZE = (800, 200)
+SPARKLINE_SIZE = (120, 32)
+
+def get_trend_points(trend_history, counts, run_date):
+    """Get a report's trend points, oldest first: its saved rows followed by today's counts"""
+    points = [
+        (str(row.run_date), tuple(getattr(row, status) or 0 for status in STATUS_COLUMNS))
+        for row in trend_history
+    ]
+    points.append((run_date, counts))
+    return points
+
+def get_chart_coordinates(values, width, height, low, high):
+    """Scale a series onto an SVG viewBox, a single value drawn as a flat line"""
+    if len(values) == 1:
+        values = values * 2
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    return [(index * step, height - (value - low) * height / span) for index, value in enumerate(values)]
+
+def format_svg_points(coordinates):
+    return ' '.join(f"{x:.1f},{y:.1f}" for x, y in coordinates)
+
+def render_sparkline(values, css_class):
+    """Render a series as an inline SVG sparkline scaled to its own range"""
+    width, height = SPARKLINE_SIZE
+    # Keep a 2 unit margin so the stroke is not clipped at the extremes
+    coordinates = get_chart_coordinates(values, width, height - 4, min(values), max(values))
+    return (
+        f'<svg class="sparkline {css_class}" viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+        f'<polyline points="{format_svg_points((x, y + 2) for x, y in coordinates)}"/></svg>'
+    )
+
+def render_stacked_area_chart(points):
+    """Render status counts per run as an inline SVG stacked area chart, passed at the bottom"""
+    width, height = TREND_CHART_SIZE
+    top = max(sum(counts) for _, counts in points) or 1
+    lower = [0] * len(points)
+    layers = []
+    for index, status in enumerate(STATUS_COLUMNS):
+        upper = [below + counts[index] for below, (_, counts) in zip(lower, points)]
+        outline = (
+            get_chart_coordinates(upper, width, height, 0, top)
+            + get_chart_coordinates(lower, width, height, 0, top)[::-1]
+        )
+        layers.append(
+            f'<polygon class="trend-{status.replace("_", "-")}" points="{format_svg_points(outline)}">'
+            f'<title>{get_status_display(status)}</title></polygon>'
+        )
+        lower = upper
+    return (
+        f'<svg class="trend-chart" viewBox="0 0 {width} {height}" preserveAspectRatio="none" '
+        f'role="img" aria-label="Test case status counts per run">{"".join(layers)}</svg>'
+    )
+
+def format_trend_change(values):
+    """Format the change of a series since its previous run"""
+    if len(values) < 2:
+        return ''
+    change = values[-1] - values[-2]
+    return f"{change:+}" if change else "±0"
+
+def render_trend_section(trend_history, counts, run_date):
+    """Render the trend section: a sparkline per status and success rate, and a stacked area chart"""
+    points = get_trend_points(trend_history, counts, run_date)
+    sparkline_card = get_template('trend_sparkline')
+    sparklines = []
+    for index, status in enumerate(STATUS_COLUMNS):
+        values = [counts[index] for _, counts in points]
+        sparklines.append(sparkline_card.render(
+            title=get_status_display(status),
+            value=values[-1],
+            change=format_trend_change(values),
+            sparkline=render_sparkline(values, f"trend-{status.replace('_', '-')}")
+        ))
+    rates = [get_success_rate(counts[0], sum(counts)) for _, counts in points]
+    sparklines.append(sparkline_card.render(
+        title='Success Rate',
+        value=f"{rates[-1]}%",
+        change=format_trend_change(rates),
+        sparkline=render_sparkline([float(rate) for rate in rates], 'trend-success-rate')
+    ))
+    return get_template('trend_section').render(
+        run_count=len(points),
+        first_date=points[0][0],
+        last_date=points[-1][0],
+        max_total=max(sum(counts) for _, counts in points),
+        sparklines=''.join(sparklines),
+        area_chart=render_stacked_area_chart(points)
+    )
+
+# Buffer size used when streaming report chunks to disk
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# Compressed copies that can be written alongside (or instead of) the report
+COMPRESSION_FORMATS = ('gzip', 'brotli')
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+def get_temp_path(path):
+    """Get the temporary name a file is written under before it is moved into place"""
+    return f"{path}.{os.getpid()}.tmp"
+
+class GzipSink:
+    """Streams report bytes into a .gz file, under a temporary name until moved into place"""
+
+    extension = '.gz'
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = get_temp_path(path)
+        self._file = open(self.temp_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self._gzip = gzip.GzipFile(
+            filename=os.path.basename(path[:-len(self.extension)]),
+            mode='wb',
+            compresslevel=GZIP_LEVEL,
+            fileobj=self._file
+        )
+
+    def write(self, data):
+        self._gzip.write(data)
+
+    def close(self):
+        self._gzip.close()
+        self._file.close()
+
+class BrotliSink:
+    """Streams report bytes into a .br file, under a temporary name until moved into place"""
+
+    extension = '.br'
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = get_temp_path(path)
+        self._file = open(self.temp_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+
+    def write(self, data):
+        self._file.write(self._compressor.process(data))
+
+    def close(self):
+        self._file.write(self._compressor.finish())
+        self._file.close()
+
+COMPRESSION_SINKS = {
+    'gzip': GzipSink,
+    'brotli': BrotliSink
+}
+
+def get_compression_formats(option):
+    """Expand the --compress option into the formats to write"""
+    if not option:
+        return ()
+    if option == 'all':
+        # Brotli is optional; 'all' quietly skips it when it is not installed
+        return tuple(fmt for fmt in COMPRESSION_FORMATS if fmt != 'brotli' or brotli is not None)
+    return (option,)
+
+def write_report(chunks, filename, stream=None, compression=(), keep_plain=True):
+    """Stream report chunks to the plain report and any compressed copies in one pass
+
+    Chunks go to the binary stream when one is given, otherwise to filename
+    unless keep_plain is False. Each compression format writes
+    filename + its extension. Every file is written under a temporary
+    name and moved into place only once all of them are complete, so a
+    failed render or sink never leaves a truncated report behind. Returns the raw size
+    and the path, size and compression time of every compressed copy.
+    """
+    sinks = []
+    compress_times = []
+    plain = stream
+    plain_path = None
+    raw_bytes = 0
+    try:
+        try:
+            for fmt in compression:
+                sink_class = COMPRESSION_SINKS[fmt]
+                sinks.append(sink_class(filename + sink_class.extension))
+                compress_times.append(0.0)
+            if plain is None and keep_plain:
+                plain_path = get_temp_path(filename)
+                plain = open(plain_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+
+            for chunk in chunks:
+                data = chunk.encode('utf-8')
+                raw_bytes += len(data)
+                if plain is not None:
+                    plain.write(data)
+                for index, sink in enumerate(sinks):
+                    start = time.perf_counter()
+                    sink.write(data)
+                    compress_times[index] += time.perf_counter() - start
+        finally:
+            if plain is stream and stream is not None:
+                stream.flush()
+            elif plain is not None:
+                plain.close()
+            for index, sink in enumerate(sinks):
+                start = time.perf_counter()
+                sink.close()
+                compress_times[index] += time.perf_counter() - start
+    except BaseException:
+        temp_paths = [sink.temp_path for sink in sinks] + [plain_path]
+        for temp_path in temp_paths:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+        raise
+    if plain_path:
+        os.replace(plain_path, filename)
+    for sink in sinks:
+        os.replace(sink.temp_path, sink.path)
+
+    compressed = [
+        {
+            'format': fmt,
+            'path': sink.path,
+            'bytes': os.path.getsize(sink.path),
+            'seconds': seconds
+        }
+        for fmt, sink, seconds in zip(compression, sinks, compress_times)
+    ]
+    return {'raw_bytes': raw_bytes, 'compressed': compressed}
+
+def print_write_stats(stats):
+    """Print the raw and compressed sizes of a written report"""
+    print(f"Report Size: {stats['raw_bytes']} bytes")
+    for output in stats['compressed']:
+        ratio = output['bytes'] / stats['raw_bytes'] * 100 if stats['raw_bytes'] else 0
+        print(
+            f"{output['format'].title()} Size: {output['bytes']} bytes "
+            f"({ratio:.1f}% of raw, compressed in {output['seconds']:.3f}s) -> {output['path']}"
+        )
 
 def get_css_styles():
     """Return CSS styles for the HTML report with navigation"""
@@ -1124,32 +3488,99 @@ def get_css_styles():
         .bug .kpi-indicator { background-color: var(--info-color); }
         .not-implemented .kpi-indicator { background-color: #95a5a6; }
         
-        .section {
-            background-color: white;
+        /* Trend section */
+        .sparkline-container {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
+            gap: 15px;
+            margin-bottom: 25px;
+        }
+        
+        .sparkline-card {
+            border: 1px solid #eee;
             border-radius: var(--border-radius);
-            box-shadow: var(--box-shadow);
-            padding: 25px;
-            margin-bottom: 30px;
-            scroll-margin-top: 80px;
+            padding: 10px 15px;
         }
         
-        .section-title {
+        .sparkline-title {
+            font-size: 14px;
+            color: #777;
+        }
+        
+        .sparkline-value {
             font-size: 20px;
+            font-weight: bold;
             color: var(--dark-color);
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #eee;
         }
         
-        table {
+        .sparkline-change {
+            font-size: 13px;
+            font-weight: normal;
+            color: #777;
+        }
+        
+        .sparkline {
             width: 100%;
-            border-collapse: collapse;
-            margin-bottom: 20px;
+            height: 32px;
+            fill: none;
+            stroke-width: 2;
         }
         
-        th {
-            background-color: var(--dark-color);
-            color: white;
+        .trend-chart {
+            width: 100%;
+            height: 200px;
+            display: block;
+            background-color: #fafbfc;
+        }
+        
+        .trend-chart-scale, .trend-chart-axis {
+            font-size: 12px;
+            color: #777;
+        }
+        
+        .trend-chart-axis {
+            display: flex;
+            justify-content: space-between;
+        }
+        
+        .trend-chart .trend-passed { fill: var(--success-color); }
+        .trend-chart .trend-failed { fill: var(--danger-color); }
+        .trend-chart .trend-blocked { fill: var(--warning-color); }
+        .trend-chart .trend-application-bug { fill: var(--info-color); }
+        .trend-chart .trend-not-implemented { fill: #95a5a6; }
+        .sparkline.trend-passed { stroke: var(--success-color); }
+        .sparkline.trend-failed { stroke: var(--danger-color); }
+        .sparkline.trend-blocked { stroke: var(--warning-color); }
+        .sparkline.trend-application-bug { stroke: var(--info-color); }
+        .sparkline.trend-not-implemented { stroke: #95a5a6; }
+        .sparkline.trend-success-rate { stroke: var(--primary-color); }
+        
+        .section {
+            background-color: white;
+            border-radius: var(--border-radius);
+            box-shadow: var(--box-shadow);
+            padding: 25px;
+            margin-bottom: 30px;
+            scroll-margin-top: 80px;
+        }
+        
+        .section-title {
+            font-size: 20px;
+            color: var(--dark-color);
+            margin-bottom: 20px;
+            padding-bottom: 10px;
+            border-bottom: 2px solid #eee;
+        }
+        
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-bottom: 20px;
+        }
+        
+        th {
+            background-color: var(--dark-color);
+            color: white;
             text-align: left;
             padding: 12px 15px;
             font-weight: 600;
@@ -1449,78 +3880,1348 @@ def get_css_styles():
         }
     """
 
-def main():
-    """Main function"""
-    if len(sys.argv) != 2:
-        print("Usage: python 1p_report_generator.py <test_plan_id>")
-        sys.exit(1)
-    
-    test_plan_id = sys.argv[1]
-    
+def get_js_script():
+    """Return JavaScript for the navigation menu and back to top button"""
+    return """
+        // Smooth scrolling for navigation links
+        document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+            anchor.addEventListener('click', function (e) {
+                e.preventDefault();
+                const target = document.querySelector(this.getAttribute('href'));
+                if (target) {
+                    target.scrollIntoView({
+                        behavior: 'smooth',
+                        block: 'start'
+                    });
+                }
+            });
+        });
+        
+        // Back to top button functionality
+        const backToTopBtn = document.getElementById('backToTop');
+        
+        window.addEventListener('scroll', () => {
+            if (window.pageYOffset > 300) {
+                backToTopBtn.style.display = 'block';
+            } else {
+                backToTopBtn.style.display = 'none';
+            }
+        });
+        
+        backToTopBtn.addEventListener('click', () => {
+            window.scrollTo({
+                top: 0,
+                behavior: 'smooth'
+            });
+        });
+        
+        // Highlight active section in navigation
+        const sections = document.querySelectorAll('.section, header');
+        const navLinks = document.querySelectorAll('.nav-links a');
+        
+        window.addEventListener('scroll', () => {
+            let current = '';
+            sections.forEach(section => {
+                const sectionTop = section.offsetTop;
+                const sectionHeight = section.clientHeight;
+                if (pageYOffset >= sectionTop - 100) {
+                    current = section.getAttribute('id');
+                }
+            });
+            
+            navLinks.forEach(link => {
+                link.classList.remove('active');
+                if (link.getAttribute('href') === '#' + current) {
+                    link.classList.add('active');
+                }
+            });
+        });
+    """
+
+def get_breakdown_styles():
+    """Return CSS for the controls of the client-side breakdown table"""
+    return """
+        .breakdown-controls {
+            display: flex;
+            flex-wrap: wrap;
+            align-items: center;
+            gap: 12px;
+            margin-bottom: 15px;
+        }
+        
+        .breakdown-controls select,
+        .breakdown-controls button {
+            padding: 6px 10px;
+            border: 1px solid #ddd;
+            border-radius: 4px;
+            background-color: white;
+            font: inherit;
+            cursor: pointer;
+        }
+        
+        .breakdown-controls button:disabled {
+            opacity: 0.5;
+            cursor: default;
+        }
+    """
+
+def get_breakdown_script():
+    """Return JavaScript drawing the client-side breakdown table from its JSON data
+
+    Only reports with a JSON breakdown carry it and get_breakdown_styles,
+    so the shared assets stay the same for table mode.
+    """
+    return """
+        // Breakdown table drawn a page at a time from its JSON data, filtered by squad and status
+        function renderBreakdown(table, data) {
+            const body = table.tBodies[0];
+            const squadFilter = document.getElementById('breakdown-squad');
+            const statusFilter = document.getElementById('breakdown-status');
+            const pageInfo = document.getElementById('breakdown-page');
+            const previousBtn = document.getElementById('breakdown-prev');
+            const nextBtn = document.getElementById('breakdown-next');
+            const featureTotals = new Array(data.features.length).fill(0);
+            data.rows.forEach(row => { featureTotals[row[0]] += row[3]; });
+            data.squads.forEach((squad, index) => squadFilter.add(new Option(squad[0], index)));
+            data.statuses.forEach((status, index) => statusFilter.add(new Option(status[0], index)));
+            let rows = data.rows;
+            let page = 0;
+            
+            function addCell(tr, text) {
+                const td = tr.insertCell();
+                td.textContent = text;
+                return td;
+            }
+            
+            function draw() {
+                const pages = Math.max(1, Math.ceil(rows.length / data.pageSize));
+                page = Math.min(Math.max(page, 0), pages - 1);
+                const start = page * data.pageSize;
+                const end = Math.min(start + data.pageSize, rows.length);
+                const fragment = document.createDocumentFragment();
+                let feature = null;
+                for (let i = start; i < end; i++) {
+                    const row = rows[i];
+                    if (row[0] !== feature) {
+                        feature = row[0];
+                        const header = document.createElement('tr');
+                        header.className = 'feature-header';
+                        addCell(header, `${data.features[feature]} (${featureTotals[feature]} total)`).colSpan = 4;
+                        fragment.appendChild(header);
+                    }
+                    const tr = document.createElement('tr');
+                    addCell(tr, data.features[row[0]]);
+                    const squadCell = tr.insertCell();
+                    squadCell.className = 'squad-column';
+                    squadCell.innerHTML = data.squads[row[1]][1];
+                    squadCell.appendChild(document.createTextNode(data.squads[row[1]][0]));
+                    tr.insertCell().innerHTML = data.statuses[row[2]][1];
+                    addCell(tr, row[3]);
+                    fragment.appendChild(tr);
+                }
+                body.replaceChildren(fragment);
+                pageInfo.textContent = rows.length
+                    ? `Rows ${start + 1}-${end} of ${rows.length} (page ${page + 1} of ${pages})`
+                    : 'No matching rows';
+                previousBtn.disabled = page === 0;
+                nextBtn.disabled = page >= pages - 1;
+            }
+            
+            function applyFilters() {
+                const squad = squadFilter.value === '' ? -1 : Number(squadFilter.value);
+                const status = statusFilter.value === '' ? -1 : Number(statusFilter.value);
+                rows = data.rows.filter(row => (squad < 0 || row[1] === squad) && (status < 0 || row[2] === status));
+                page = 0;
+                draw();
+            }
+            
+            squadFilter.addEventListener('change', applyFilters);
+            statusFilter.addEventListener('change', applyFilters);
+            previousBtn.addEventListener('click', () => { page--; draw(); });
+            nextBtn.addEventListener('click', () => { page++; draw(); });
+            draw();
+        }
+        
+        // Deferred breakdown data files have loaded by DOMContentLoaded
+        document.addEventListener('DOMContentLoaded', () => {
+            const table = document.getElementById('breakdown-table');
+            if (!table) {
+                return;
+            }
+            const source = document.getElementById('breakdown-data');
+            const data = source ? JSON.parse(source.textContent) : window.breakdownData;
+            if (data) {
+                renderBreakdown(table, data);
+            } else {
+                document.getElementById('breakdown-page').textContent = 'Breakdown data could not be loaded';
+            }
+        });
+    """
+
+# Shared report assets that can be written once and linked from every report
+REPORT_ASSETS = {
+    'css': get_css_styles,
+    'js': get_js_script
+}
+ASSET_MODES = ('inline', 'external')
+
+def get_asset_filename(kind, content):
+    """Get the content-hashed file name of a shared report asset"""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+    return f"report.{digest}.{kind}"
+
+def write_report_assets(directory):
+    """Write the shared stylesheet and script once and return their file names
+
+    Files are named after a hash of their content, so an unchanged asset is
+    never rewritten and browsers can cache it indefinitely.
+    """
+    assets = {}
+    for kind, get_content in REPORT_ASSETS.items():
+        content = get_content()
+        filename = get_asset_filename(kind, content)
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            # Write under a temporary name so concurrent runs never see a partial file
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        assets[kind] = filename
+    return assets
+
+class ConnectionPool:
+    """Bounded pool of database connections shared by batch worker threads"""
+
+    def __init__(self, size, backend=None):
+        self.size = size
+        self.backend = backend or MySQLBackend()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening one lazily while under the pool size"""
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                with profile_stage('connect'):
+                    connection = self.backend.connect()
+            try:
+                yield connection
+            except Exception:
+                # Do not hand a connection in an unknown state to the next plan
+                connection.close()
+                raise
+            self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+def parse_plan_ids(spec):
+    """Parse a plan list such as '101,105,110-120' into sorted unique plan IDs"""
+    plan_ids = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+            if start > end:
+                raise ValueError(f"Invalid plan range: {part}")
+            plan_ids.update(range(start, end + 1))
+        else:
+            plan_ids.add(int(part))
+    return sorted(plan_ids)
+
+def get_report_filename(test_plan_id=None, scope=DEFAULT_REPORT_SCOPE):
+    """Get the report file name; batch runs include the plan ID to keep files apart"""
+    date_prefix = datetime.now().strftime('%Y%m%d')
+    file_suffix = get_report_scope(scope)['file_suffix']
+    if test_plan_id is None:
+        return f"{date_prefix}_{file_suffix}.html"
+    return f"{date_prefix}_{test_plan_id}_{file_suffix}.html"
+
+def fetch_plans_report_data(pool, test_plan_ids, strategy=DEFAULT_LATEST_RUN_STRATEGY,
+                            cache=None, data_fingerprints=None, state_dir=None,
+                            scope=DEFAULT_REPORT_SCOPE, tag_lookup=False):
+    """Fetch report data for plans in one query on a pooled connection
+
+    With a cache, plans whose aggregates are cached for their current data
+    fingerprint are not queried, and fetched aggregates are cached. With a
+    state_dir, each plan folds its new runs into its saved state instead;
+    otherwise the rows are aggregated while they are streamed.
+    """
+    data_fingerprints = data_fingerprints or {}
+    plan_data = {}
+    with pool.connection() as connection:
+        if cache:
+            for test_plan_id in test_plan_ids:
+                if test_plan_id in data_fingerprints:
+                    report_data = cache.get(test_plan_id, data_fingerprints[test_plan_id], strategy, scope)
+                    if report_data is not None:
+                        plan_data[test_plan_id] = report_data
+        missing_plan_ids = [plan_id for plan_id in test_plan_ids if plan_id not in plan_data]
+
+        if missing_plan_ids:
+            if strategy == 'materialized':
+                for test_plan_id in missing_plan_ids:
+                    refresh_latest_run_table(connection, test_plan_id, tag_lookup)
+            if state_dir:
+                fetched = {
+                    test_plan_id: get_incremental_report_data(
+                        connection, test_plan_id, state_dir, strategy, data_fingerprints.get(test_plan_id),
+                        tag_lookup
+                    )
+                    for test_plan_id in missing_plan_ids
+                }
+            else:
+                fetched = get_streamed_report_data(connection, missing_plan_ids, strategy, scope, tag_lookup)
+            if cache:
+                for test_plan_id, report_data in fetched.items():
+                    if report_data['overall_summary'] and test_plan_id in data_fingerprints:
+                        cache.put(test_plan_id, data_fingerprints[test_plan_id], strategy, scope, report_data)
+            plan_data.update(fetched)
+        return plan_data
+
+def render_report_file(test_plan_id, report_data, filename, assets=None,
+                       compression=(), keep_plain=True, trend_history=None, scope=DEFAULT_REPORT_SCOPE,
+                       breakdown_mode='table'):
+    """Render one plan's report and stream it to disk; runs in a worker process"""
+    breakdown_source = get_breakdown_source(breakdown_mode, report_data['feature_breakdown'], filename)
+    return write_report(
+        iter_html_report(
+            test_plan_id, assets=assets, trend_history=trend_history, scope=scope,
+            breakdown_source=breakdown_source, **report_data
+        ),
+        filename,
+        compression=compression,
+        keep_plain=keep_plain
+    )
+
+def generate_batch_reports(plan_ids, db_workers=4, render_workers=None,
+                           strategy=DEFAULT_LATEST_RUN_STRATEGY, set_based=False,
+                           asset_mode='inline', compression=(), keep_plain=True, backend=None,
+                           force=False, cache=None, from_cache=False, state_dir=None,
+                           trend_runs=DEFAULT_TREND_RUNS, scope=DEFAULT_REPORT_SCOPE,
+                           breakdown_mode='table'):
+    """Generate reports for many plans concurrently and return per-plan timings
+
+    Database work runs on a thread pool sharing a bounded connection pool;
+    HTML rendering runs on a process pool and starts as soon as a plan's
+    data has been fetched. With set_based, all plans are fetched by a
+    single query and its time is reported against every plan. Plans whose
+    data fingerprint matches their last report are skipped unless force.
+    With from_cache, every plan is rendered from its latest cached
+    aggregates and the database is not contacted. With state_dir, plans
+    are aggregated incrementally from their saved state. The trend history
+    of every plan is read in one query; trend_runs=0 leaves it out.
+    Only scopes whose counts are kept in test_run_trend save and chart
+    trend rows. breakdown_mode is one of BREAKDOWN_MODES.
+    """
+    trend_runs = trend_runs if get_report_scope(scope)['trend'] else 0
+    pool = ConnectionPool(db_workers, backend)
+    assets = write_report_assets('.') if asset_mode == 'external' else None
+    results = {
+        plan_id: {'test_plan_id': plan_id, 'status': 'pending', 'fetch_time': 0.0,
+                  'render_time': 0.0, 'total_tests': 0, 'pass_rate': 0, 'filename': None,
+                  'write_stats': None}
+        for plan_id in plan_ids
+    }
+
+    data_fingerprints = {}
+    tag_lookup = False
+
+    def timed_fetch(test_plan_ids):
+        start = time.perf_counter()
+        if from_cache:
+            plan_data = {
+                plan_id: cache.get_latest(plan_id, strategy, scope) or build_report_data([])
+                for plan_id in test_plan_ids
+            }
+        else:
+            plan_data = fetch_plans_report_data(
+                pool, test_plan_ids, strategy, cache, data_fingerprints, state_dir, scope, tag_lookup
+            )
+        return plan_data, time.perf_counter() - start
+
+    try:
+        # Fingerprint before fetching: runs arriving in between only cause a
+        # needless rebuild next time, never a stale skip. Forced runs without
+        # a cache or saved state have no use for it.
+        if not from_cache and (not force or cache or state_dir):
+            with profile_stage('fingerprint'), pool.connection() as connection:
+                data_fingerprints.update(get_data_fingerprints(connection, plan_ids))
+        render_signature = get_render_signature(
+            asset_mode, compression, keep_plain, trend_runs, scope, breakdown_mode
+        )
+        fingerprints = {
+            plan_id: {'test_plan_id': plan_id, 'data': data_fingerprint, 'render': render_signature}
+            for plan_id, data_fingerprint in data_fingerprints.items()
+        }
+
+        stale_plan_ids = []
+        for plan_id in plan_ids:
+            filename = get_report_filename(plan_id, scope)
+            if not force and plan_id in fingerprints and is_report_current(filename, fingerprints[plan_id]):
+                summary = load_report_fingerprint(filename).get('summary') or {}
+                results[plan_id].update(summary, status='unchanged', filename=filename)
+            else:
+                stale_plan_ids.append(plan_id)
+
+        # Tag the plans' features once here rather than in every fetch thread
+        if stale_plan_ids and not from_cache and get_report_scope(scope)['tags'] is not None:
+            with profile_stage('prepare'), pool.connection() as connection:
+                tag_lookup = refresh_feature_tags(connection, stale_plan_ids)
+
+        # Saved trend rows stop before today, so reading them first cannot race the trend save
+        trend_histories = {}
+        if trend_runs and not from_cache:
+            with profile_stage('trend'), pool.connection() as connection:
+                trend_histories = get_trend_history(connection, stale_plan_ids, trend_runs - 1)
+
+        if set_based:
+            plan_groups = [stale_plan_ids] if stale_plan_ids else []
+        else:
+            plan_groups = [[plan_id] for plan_id in stale_plan_ids]
+
+        with ThreadPoolExecutor(max_workers=db_workers) as db_executor, \
+                ProcessPoolExecutor(max_workers=render_workers, initializer=set_squad_registry,
+                                    initargs=(_squad_registry,)) as render_executor:
+            fetch_futures = {db_executor.submit(timed_fetch, group): group for group in plan_groups}
+            render_futures = {}
+            trend_summaries = {}
+
+            for future in as_completed(fetch_futures):
+                try:
+                    plan_data, fetch_time = future.result()
+                except Exception as e:
+                    for plan_id in fetch_futures[future]:
+                        results[plan_id]['status'] = f"error: {e}"
+                    continue
+
+                for plan_id, report_data in plan_data.items():
+                    result = results[plan_id]
+                    result['fetch_time'] = fetch_time
+
+                    overall_summary = report_data['overall_summary']
+                    if not overall_summary:
+                        result['status'] = 'no data'
+                        continue
+
+                    totals = get_status_totals(overall_summary)
+                    total_tests, passed = totals['total_tests'], totals['passed']
+                    result['total_tests'] = total_tests
+                    result['pass_rate'] = round((passed / total_tests * 100), 1) if total_tests > 0 else 0
+                    result['filename'] = get_report_filename(plan_id, scope)
+
+                    trend_summaries[plan_id] = overall_summary
+                    render_futures[render_executor.submit(
+                        render_report_file, plan_id, report_data, result['filename'],
+                        assets, compression, keep_plain, trend_histories.get(plan_id), scope,
+                        breakdown_mode
+                    )] = (plan_id, time.perf_counter())
+
+            # Every plan's trend row in one round trip, while the renders run
+            if trend_summaries and not from_cache and get_report_scope(scope)['trend']:
+                with profile_stage('save_trend'), pool.connection() as connection:
+                    save_test_run_trends(connection, trend_summaries)
+
+            for future in as_completed(render_futures):
+                plan_id, submitted = render_futures[future]
+                result = results[plan_id]
+                try:
+                    result['write_stats'] = future.result()
+                    result['status'] = 'ok'
+                    if plan_id in fingerprints:
+                        save_report_fingerprint(
+                            result['filename'], fingerprints[plan_id], result['write_stats'], keep_plain,
+                            {'total_tests': result['total_tests'], 'pass_rate': result['pass_rate']},
+                            get_linked_files(result['filename'], assets, breakdown_mode)
+                        )
+                    else:
+                        remove_report_fingerprint(result['filename'])
+                except Exception as e:
+                    result['status'] = f"error: {e}"
+                # Includes time spent queued behind other renders
+                result['render_time'] = time.perf_counter() - submitted
+    finally:
+        pool.close()
+
+    return [results[plan_id] for plan_id in plan_ids]
+
+def print_batch_summary(results, elapsed):
+    """Print the per-plan timing summary of a batch run"""
+    print(f"\n{'='*78}")
+    print(f"{'Plan':>8}  {'Status':<12} {'Tests':>7} {'Pass %':>7} {'Fetch s':>8} {'Render s':>9}  File")
+    print(f"{'-'*78}")
+    for result in results:
+        print(
+            f"{result['test_plan_id']:>8}  {result['status'][:12]:<12} {result['total_tests']:>7} "
+            f"{result['pass_rate']:>7} {result['fetch_time']:>8.2f} {result['render_time']:>9.2f}  "
+            f"{result['filename'] or '-'}"
+        )
+    succeeded = sum(1 for result in results if result['status'] == 'ok')
+    unchanged = sum(1 for result in results if result['status'] == 'unchanged')
+    written = [result['write_stats'] for result in results if result['write_stats']]
+    print(f"{'-'*78}")
+    print(f"{succeeded}/{len(results)} reports generated in {elapsed:.2f}s")
+    if unchanged:
+        print(f"{unchanged} unchanged since their last report (use --force to rebuild)")
+    if written:
+        raw_bytes = sum(stats['raw_bytes'] for stats in written)
+        print(f"Raw report bytes: {raw_bytes}")
+        compressed_bytes = defaultdict(int)
+        for stats in written:
+            for output in stats['compressed']:
+                compressed_bytes[output['format']] += output['bytes']
+        for fmt, size in compressed_bytes.items():
+            print(f"{fmt.title()} bytes: {size} ({size / raw_bytes * 100:.1f}% of raw)")
+    print(f"{'='*78}\n")
+
+# Squads and status weights synthetic test runs are drawn from
+SYNTHETIC_SQUADS = (
+    'A-Team', 'Rajput Royals', 'Mavericks', 'Pirates', 'Ganges Gangsters', 'Spartans',
+    'Chalukyas', 'Dravidian Dynamos', 'Hackers & Painters', 'ShadowFax', 'Autobots',
+    'Chera super kings', 'Rashtrakutas'
+)
+SYNTHETIC_STATUS_WEIGHTS = {
+    'passed': 70,
+    'failed': 12,
+    'blocked': 6,
+    'application_bug': 7,
+    'not_implemented': 5
+}
+
+def load_synthetic_data(connection, test_plan_ids, cases_per_plan=500, runs_per_case=3,
+                        squad_count=8, feature_count=25, epic_count=40, seed=0):
+    """Replace the runs of the given plans with reproducible synthetic ones
+
+    Every test case keeps its squad, feature and EPICs across plans and is
+    run runs_per_case times on consecutive days. One feature in ten is
+    outside the 1P scope. Returns the number of runs inserted.
+    """
+    rng = random.Random(seed)
+    squads = [
+        SYNTHETIC_SQUADS[index] if index < len(SYNTHETIC_SQUADS) else f"Squad {index + 1}"
+        for index in range(squad_count)
+    ]
+    features = [
+        f"Feature {index + 1}" + ('' if index % 10 == 9 else ' [1P]')
+        for index in range(feature_count)
+    ]
+    statuses = list(SYNTHETIC_STATUS_WEIGHTS)
+    weights = list(SYNTHETIC_STATUS_WEIGHTS.values())
+    cases = [
+        (f"TC-{case + 1}", rng.choice(squads), rng.choice(features))
+        for case in range(cases_per_plan)
+    ]
+    epic_links = [
+        (test_case_key, f"EPIC-{epic + 1}", f"Synthetic EPIC {epic + 1}")
+        for test_case_key, _, _ in cases
+        for epic in rng.sample(range(epic_count), rng.randint(0, min(2, epic_count)))
+    ]
+    first_run = datetime(2025, 1, 1, 9, 0)
+
+    def runs():
+        for plan_index, test_plan_id in enumerate(test_plan_ids):
+            for test_case_key, owner, feature in cases:
+                for run in range(runs_per_case):
+                    created_at = first_run + timedelta(days=plan_index + run, seconds=rng.randrange(36000))
+                    status = rng.choices(statuses, weights)[0]
+                    yield (test_plan_id, test_case_key, owner, feature, status, created_at)
+
+    with connection.cursor() as cursor:
+        cursor.executemany("DELETE FROM tc_test_run WHERE test_plan_id = %s", [(plan_id,) for plan_id in test_plan_ids])
+        cursor.executemany("DELETE FROM tc_case_epic WHERE test_case_id = %s", [(case[0],) for case in cases])
+        cursor.executemany(
+            """
+            INSERT INTO tc_test_run
+                (test_plan_id, test_case_key, owner, feature, test_case_status, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            runs()
+        )
+        cursor.executemany(
+            "INSERT INTO tc_case_epic (test_case_id, epic_id, epic_title) VALUES (%s, %s, %s)",
+            epic_links
+        )
+    connection.commit()
+    return len(test_plan_ids) * cases_per_plan * runs_per_case
+
+# Benchmarks available through --benchmark
+BENCHMARKS = ('templates', 'queries', 'pipeline')
+
+def benchmark_templates(row_count=2000, repeat=5, plan_size=50):
+    """Time breakdown row rendering through compiled templates against inline f-strings
+
+    The uncached run recompiles the template every plan_size rows to show
+    what a batch of small plans would pay without the template cache.
+    """
+    squads = ['A-Team', 'Rajput Royals', 'Mavericks', 'Pirates', 'Spartans', 'ShadowFax']
+    statuses = list(STATUS_COLUMNS)
+    rows = [
+        BreakdownRow(
+            f"Feature {index // 20} [1P]",
+            squads[index % len(squads)],
+            statuses[index % len(statuses)],
+            index % 37 + 1
+        )
+        for index in range(row_count)
+    ]
+
+    squad_icons = _squad_registry.icon_html
+    status_badges = _squad_registry.status_html
+
+    def render_fstring(item):
+        return f"""
+            <tr>
+                <td>{item.feature}</td>
+                <td class="squad-column">
+                    {squad_icons[item.squad]}
+                    {item.squad}
+                </td>
+                <td>{status_badges[item.test_case_status]}</td>
+                <td>{item.count}</td>
+            </tr>
+        """
+
+    def render_template(item, template):
+        return template.render(
+            item,
+            squad_icon=squad_icons[item.squad],
+            status_badge=status_badges[item.test_case_status]
+        )
+
+    def run_fstring():
+        return ''.join(render_fstring(item) for item in rows)
+
+    def run_cached_template():
+        template = get_template('breakdown_row', BreakdownRow)
+        return ''.join(render_template(item, template) for item in rows)
+
+    def run_uncached_template():
+        # Compiles the layout for every plan, as a batch run without the cache would
+        output = []
+        for plan_start in range(0, row_count, plan_size):
+            template = CompiledTemplate(REPORT_TEMPLATES['breakdown_row'], 'breakdown_row', BreakdownRow)
+            output.extend(render_template(item, template) for item in rows[plan_start:plan_start + plan_size])
+        return ''.join(output)
+
+    if run_fstring() != run_cached_template():
+        raise AssertionError("Template output differs from the f-string output")
+
+    results = []
+    for label, func in (('f-string', run_fstring),
+                        ('compiled template (cached)', run_cached_template),
+                        ('compiled template (uncached)', run_uncached_template)):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        results.append({'renderer': label, 'rows': row_count, 'best_seconds': min(timings)})
+
+    baseline = results[0]['best_seconds']
+    print(f"\n{'Renderer':<30} {'Rows':>8} {'Best ms':>10} {'vs f-string':>12}")
+    print(f"{'-'*63}")
+    for result in results:
+        ratio = result['best_seconds'] / baseline if baseline else 0
+        print(f"{result['renderer']:<30} {result['rows']:>8} {result['best_seconds']*1000:>10.2f} {ratio:>11.2f}x")
+    print()
+    return results
+
+def benchmark_queries(plan_count=20, cases_per_plan=200, repeat=5):
+    """Time the snapshot query with inlined literals against one reused parameterized statement
+
+    Runs on a SQLite stand-in for MySQL. SQLite's per-connection statement
+    cache behaves like server-side prepared statements: identical statement
+    text is parsed and planned once, while inlined plan IDs force a fresh
+    prepare for every plan. Each pass opens a new connection, as every
+    nightly run does.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'benchmark.db')
+        connection = SQLiteBackend(database).connect()
+        load_synthetic_data(connection, list(range(1, plan_count + 1)), cases_per_plan)
+        ensure_latest_run_index(connection)
+        connection.close()
+
+        query, _ = get_latest_run_snapshot_query(0, 'row_number')
+        parameterized_query = query.replace('%s', '?')
+
+        def sql_literal(value):
+            if isinstance(value, str):
+                return "'" + value.replace("'", "''") + "'"
+            return str(value)
+
+        def run_pass(parameterized):
+            connection = sqlite3.connect(database)
+            cursor = connection.cursor()
+            start = time.perf_counter()
+            for plan_id in range(1, plan_count + 1):
+                _, params = get_latest_run_snapshot_query(plan_id, 'row_number')
+                if parameterized:
+                    cursor.execute(parameterized_query, params)
+                else:
+                    cursor.execute(query % tuple(sql_literal(value) for value in params))
+                cursor.fetchall()
+            elapsed = time.perf_counter() - start
+            connection.close()
+            return elapsed
+
+        results = []
+        for label, parameterized in (('inlined literals', False), ('parameterized', True)):
+            best = min(run_pass(parameterized) for _ in range(repeat))
+            results.append({'mode': label, 'queries': plan_count, 'best_seconds': best})
+
+    print(f"\n{'Mode':<20} {'Queries':>8} {'Best ms':>10} {'ms/query':>10}")
+    print(f"{'-'*51}")
+    for result in results:
+        per_query = result['best_seconds'] / result['queries'] * 1000
+        print(f"{result['mode']:<20} {result['queries']:>8} {result['best_seconds']*1000:>10.2f} {per_query:>10.3f}")
+    print()
+    return results
+
+# Stages timed by the pipeline benchmark, in pipeline order
+PIPELINE_STAGES = (
+    'get_overall_summary', 'get_squad_summary', 'get_feature_summary', 'get_feature_breakdown',
+    'get_epic_summary', 'get_streamed_report_data', 'generate_notable_findings', 'generate_html_report',
+    'write_report'
+)
+
+def benchmark_pipeline(scales=(1, 10), cases_per_plan=200, runs_per_case=3, squad_count=8,
+                       feature_count=25, epic_count=40, repeat=3, json_path=None):
+    """Time every stage of the report pipeline on synthetic plans of growing size
+
+    Each scale multiplies cases_per_plan and gets its own SQLite database.
+    The five get_* fetches are timed alongside the streamed snapshot fetch
+    the report uses. Results are printed and, with json_path, written as JSON
+    so runs of different versions can be compared.
+    """
+    report = {
+        'benchmark': 'pipeline',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source_sha256': get_source_hash(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'config': {
+            'scales': list(scales),
+            'cases_per_plan': cases_per_plan,
+            'runs_per_case': runs_per_case,
+            'squads': squad_count,
+            'features': feature_count,
+            'epics': epic_count,
+            'repeat': repeat
+        },
+        'results': []
+    }
+    strategy = 'row_number'
+    test_plan_id = 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            connection = SQLiteBackend(os.path.join(directory, f"scale_{scale}.db")).connect()
+            cases = cases_per_plan * scale
+            runs = load_synthetic_data(
+                connection, [test_plan_id], cases, runs_per_case,
+                squad_count, feature_count, epic_count
+            )
+            ensure_latest_run_index(connection)
+            report_path = os.path.join(directory, f"scale_{scale}.html")
+
+            data = {}
+            stages = {
+                'get_overall_summary': lambda: get_overall_summary(connection, test_plan_id, strategy),
+                'get_squad_summary': lambda: get_squad_summary(connection, test_plan_id, strategy),
+                'get_feature_summary': lambda: get_feature_summary(connection, test_plan_id, strategy),
+                'get_feature_breakdown': lambda: get_feature_breakdown(connection, test_plan_id, strategy),
+                'get_epic_summary': lambda: get_epic_summary(connection, test_plan_id, strategy),
+                'get_streamed_report_data': lambda: data.setdefault(
+                    'report', get_streamed_report_data(connection, [test_plan_id], strategy)[test_plan_id]
+                ),
+                'generate_notable_findings': lambda: generate_notable_findings(
+                    data['report']['overall_summary'], data['report']['squad_summary'],
+                    data['report']['feature_summary'], data['report']['epic_summary']
+                ),
+                'generate_html_report': lambda: data.setdefault('html', generate_html_report(test_plan_id, **data['report'])),
+                'write_report': lambda: write_report([data['html']], report_path)
+            }
+
+            result = {'scale': scale, 'test_cases': cases, 'test_runs': runs, 'stages': {}}
+            for stage in PIPELINE_STAGES:
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    output = stages[stage]()
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                if stage == 'write_report':
+                    size = output['raw_bytes']
+                elif isinstance(output, str):
+                    size = len(output.encode('utf-8'))
+                elif isinstance(output, dict):
+                    size = sum(len(rows) for rows in output.values())
+                else:
+                    size = len(output)
+                result['stages'][stage] = {
+                    'best_seconds': timings[0],
+                    'median_seconds': timings[len(timings) // 2],
+                    'size': size
+                }
+            report['results'].append(result)
+            connection.close()
+
+    print(f"\n{'Stage':<28} " + ' '.join(f"{f'{scale}x ms':>12}" for scale in scales))
+    print(f"{'-'*(29 + 13 * len(scales))}")
+    for stage in PIPELINE_STAGES:
+        timings = ' '.join(
+            f"{result['stages'][stage]['best_seconds']*1000:>12.2f}" for result in report['results']
+        )
+        print(f"{stage:<28} {timings}")
+    print(f"{'-'*(29 + 13 * len(scales))}")
+    print(f"{'test runs':<28} " + ' '.join(f"{result['test_runs']:>12}" for result in report['results']))
+
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark results written to: {json_path}")
+    print()
+    return report
+
+def run_benchmark(args):
+    """Run the benchmark selected with --benchmark"""
+    if args.benchmark == 'templates':
+        benchmark_templates(row_count=args.bench_rows)
+    elif args.benchmark == 'queries':
+        benchmark_queries(plan_count=args.bench_plans, cases_per_plan=args.bench_cases)
+    elif args.benchmark == 'pipeline':
+        benchmark_pipeline(
+            scales=args.bench_scales,
+            cases_per_plan=args.bench_cases,
+            runs_per_case=args.bench_runs,
+            squad_count=args.bench_squads,
+            feature_count=args.bench_features,
+            epic_count=args.bench_epics,
+            json_path=args.bench_json
+        )
+
+def parse_arguments(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Generate HTML stability report for 1P test cases"
+    )
+    parser.add_argument('test_plan_id', type=int, nargs='?', help="Test plan ID to report on")
+    parser.add_argument(
+        '--plans',
+        help="Batch mode: comma separated plan IDs and ranges, e.g. 101,105,110-120"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help="Batch mode: database threads and pooled connections (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--render-workers',
+        type=int,
+        default=None,
+        help="Batch mode: HTML rendering processes (default: CPU count)"
+    )
+    parser.add_argument(
+        '--set-based',
+        action='store_true',
+        help="Batch mode: fetch every plan with a single test_plan_id IN (...) query"
+    )
+    parser.add_argument(
+        '--output',
+        help="Single plan: report file to write, or '-' for stdout (default: <YYYYMMDD>_<scope>_report.html)"
+    )
+    parser.add_argument(
+        '--scope',
+        default=DEFAULT_REPORT_SCOPE,
+        help="Features to report on: '1p' features only, every feature for the 'complete' report, "
+             "or a comma separated set of feature tags such as 3P,Mobile (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--backend',
+        choices=DATABASE_BACKENDS,
+        default='mysql',
+        help="Database to read from: cx_dashboard on MySQL, or a local SQLite file (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--sqlite-path',
+        default=DEFAULT_SQLITE_PATH,
+        help="SQLite backend: database file, created if missing (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--synthetic',
+        action='store_true',
+        help="SQLite backend: replace the requested plans' runs with synthetic data first"
+    )
+    parser.add_argument(
+        '--latest-strategy',
+        choices=LATEST_RUN_STRATEGIES,
+        default=DEFAULT_LATEST_RUN_STRATEGY,
+        help="How the latest run of each test case is picked (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--ensure-index',
+        action='store_true',
+        help="Create the covering and feature scope indexes on tc_test_run and the unique "
+             "(test_plan_id, run_date) key on test_run_trend if they are missing"
+    )
+    parser.add_argument(
+        '--materialize',
+        action='store_true',
+        help="Create the tc_latest_1p_run table read by --latest-strategy materialized, and the "
+             "tc_feature_tag table so the scope filter looks feature tags up instead of using LIKE"
+    )
+    parser.add_argument(
+        '--assets',
+        choices=ASSET_MODES,
+        default='inline',
+        help="Inline CSS/JS into each report (for email) or link shared "
+             "report.<hash>.css/.js files written next to it (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--breakdown',
+        choices=BREAKDOWN_MODES,
+        default='table',
+        help="Write the detailed breakdown as table rows, or as JSON inlined into the "
+             "report or written to a .breakdown.js file next to it, drawn in pages "
+             "with squad and status filters (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--compress',
+        choices=COMPRESSION_FORMATS + ('all',),
+        help="Also write a compressed copy (.gz/.br) while streaming; 'all' "
+             "writes every available format"
+    )
+    parser.add_argument(
+        '--no-plain',
+        action='store_true',
+        help="With --compress, write only the compressed copies"
+    )
+    parser.add_argument(
+        '--squad-config',
+        metavar='FILE',
+        help='JSON file adding or overriding squad icon classes and initials and status labels, '
+             'e.g. {"squads": {"Vikings": {"icon_class": "squad-s", "initial": "V"}}}'
+    )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const=DEFAULT_CACHE_PATH,
+        help="Cache aggregates on disk, keyed by plan and data watermark, and reuse "
+             f"them while no new runs arrive (default file: {DEFAULT_CACHE_PATH})"
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help="Cache size in MB before least recently used entries are evicted (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--from-cache',
+        action='store_true',
+        help="Render from the latest cached aggregates without contacting the database"
+    )
+    parser.add_argument(
+        '--incremental',
+        nargs='?',
+        const=DEFAULT_STATE_DIR,
+        help="Keep each plan's latest runs and counters in a state directory and fold in "
+             f"only runs added since the last invocation (default directory: {DEFAULT_STATE_DIR})"
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Rebuild reports even when no runs have arrived since the last one"
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='table',
+        choices=PROFILE_FORMATS,
+        help="Report wall time and rows per query, time per render section, peak RSS "
+             "and bytes written, as a table or JSON/StatsD lines (default format: table)"
+    )
+    parser.add_argument(
+        '--profile-file',
+        help="With --profile, write the profile to this file instead of printing it"
+    )
+    parser.add_argument(
+        '--trend-runs',
+        type=int,
+        default=DEFAULT_TREND_RUNS,
+        help="Runs charted in the report's trend section, today's included; 0 leaves "
+             "the section out (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--backfill-from',
+        help="Rebuild the daily test_run_trend rows of the requested plans from this date "
+             "(YYYY-MM-DD) instead of generating reports"
+    )
+    parser.add_argument(
+        '--backfill-to',
+        help="With --backfill-from, the last date to rebuild (default: today)"
+    )
+    parser.add_argument(
+        '--benchmark',
+        choices=BENCHMARKS,
+        help="Run a micro-benchmark instead of generating a report"
+    )
+    parser.add_argument(
+        '--bench-rows',
+        type=int,
+        default=2000,
+        help="Benchmark: number of rows to render (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-plans',
+        type=int,
+        default=20,
+        help="Benchmark: number of test plans to query (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-cases',
+        type=int,
+        default=200,
+        help="Benchmark: test cases per plan (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-runs',
+        type=int,
+        default=3,
+        help="Pipeline benchmark: runs of every test case (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-squads',
+        type=int,
+        default=8,
+        help="Pipeline benchmark: number of squads (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-features',
+        type=int,
+        default=25,
+        help="Pipeline benchmark: number of features (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-epics',
+        type=int,
+        default=40,
+        help="Pipeline benchmark: number of EPICs (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-scales',
+        default='1,10',
+        help="Pipeline benchmark: comma separated multiples of --bench-cases (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--bench-json',
+        help="Pipeline benchmark: file to write the results to as JSON"
+    )
+    args = parser.parse_args(argv)
+
+    args.squad_registry = None
+    if args.squad_config:
+        try:
+            args.squad_registry = SquadRegistry.from_file(args.squad_config)
+        except (OSError, ValueError) as e:
+            parser.error(f"--squad-config {args.squad_config}: {e}")
+    if args.benchmark:
+        try:
+            args.bench_scales = [int(scale) for scale in args.bench_scales.split(',') if scale.strip()]
+        except ValueError:
+            parser.error("--bench-scales must be comma separated integers such as 1,10,100")
+        return args
+    if args.compress == 'brotli' and brotli is None:
+        parser.error("--compress brotli needs the brotli package")
+    if args.no_plain and not args.compress:
+        parser.error("--no-plain requires --compress")
+    if args.compress and args.output == '-':
+        parser.error("--compress cannot be combined with --output -")
+    if args.breakdown == 'external' and args.output == '-':
+        parser.error("--breakdown external cannot be combined with --output -")
+    if args.from_cache and not args.cache:
+        args.cache = DEFAULT_CACHE_PATH
     try:
-        test_plan_id = int(test_plan_id)
+        args.scope = normalize_report_scope(args.scope)
     except ValueError:
-        print("Error: Test plan ID must be a number")
+        parser.error("--scope must be 1p, complete or comma separated feature tags such as 3P,Mobile")
+    if not get_report_scope(args.scope)['trend'] and args.backfill_from:
+        parser.error(f"--backfill-from rebuilds the {DEFAULT_REPORT_SCOPE} trend and cannot be combined with --scope {args.scope}")
+    if args.latest_strategy == 'materialized' and get_report_scope(args.scope)['tags'] != FEATURE_SCOPE_TAGS:
+        parser.error(f"--latest-strategy materialized keeps {DEFAULT_REPORT_SCOPE} runs and cannot be combined with --scope {args.scope}")
+    if args.scope != DEFAULT_REPORT_SCOPE and (args.cache or args.incremental):
+        parser.error(f"--cache, --from-cache and --incremental keep {DEFAULT_REPORT_SCOPE} aggregates and cannot be combined with --scope {args.scope}")
+    if args.trend_runs < 0:
+        parser.error("--trend-runs must not be negative")
+    if args.backfill_to and not args.backfill_from:
+        parser.error("--backfill-to requires --backfill-from")
+    if args.backfill_from:
+        if args.from_cache:
+            parser.error("--backfill-from cannot be combined with --from-cache")
+        try:
+            args.backfill_from = date.fromisoformat(args.backfill_from)
+            args.backfill_to = date.fromisoformat(args.backfill_to) if args.backfill_to else date.today()
+        except ValueError:
+            parser.error("--backfill-from and --backfill-to must be dates such as 2025-01-31")
+        if args.backfill_from > args.backfill_to:
+            parser.error("--backfill-from must not be after --backfill-to")
+    if args.backend == 'mysql' and pymysql is None and not args.from_cache:
+        parser.error("the mysql backend needs the pymysql package; use --backend sqlite to run offline")
+    if args.synthetic and args.backend != 'sqlite':
+        parser.error("--synthetic requires --backend sqlite")
+    if args.plans:
+        try:
+            args.plan_ids = parse_plan_ids(args.plans)
+        except ValueError:
+            parser.error("--plans must be plan IDs or ranges such as 101,105,110-120")
+    elif args.test_plan_id is None:
+        parser.error("a test_plan_id or --plans is required")
+    return args
+
+def load_synthetic_plans(connection, test_plan_ids):
+    """Load synthetic runs for the plans being reported on"""
+    print(f"Loading synthetic test runs for {len(test_plan_ids)} test plans...")
+    runs = load_synthetic_data(connection, test_plan_ids)
+    print(f"Loaded {runs} synthetic test runs")
+
+def run_batch(args):
+    """Generate reports for every plan given with --plans"""
+    print(f"Generating reports for {len(args.plan_ids)} test plans")
+    backend = get_backend(args.backend, args.sqlite_path)
+    cache = get_report_cache(args)
+
+    if not args.from_cache and (args.ensure_index or args.materialize or args.synthetic):
+        connection = get_db_connection(backend)
+        try:
+            if args.synthetic:
+                load_synthetic_plans(connection, args.plan_ids)
+            if args.ensure_index:
+                ensure_latest_run_index(connection)
+                ensure_trend_unique_key(connection)
+                ensure_feature_scope_index(connection)
+            if args.materialize:
+                create_latest_run_tables(connection)
+                create_feature_tag_table(connection)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with profile_stage('batch'):
+        results = generate_batch_reports(
+            args.plan_ids,
+            db_workers=args.workers,
+            render_workers=args.render_workers,
+            strategy=args.latest_strategy,
+            set_based=args.set_based,
+            asset_mode=args.assets,
+            compression=get_compression_formats(args.compress),
+            keep_plain=not args.no_plain,
+            backend=backend,
+            force=args.force,
+            cache=cache,
+            from_cache=args.from_cache,
+            state_dir=args.incremental,
+            trend_runs=args.trend_runs,
+            scope=args.scope,
+            breakdown_mode=args.breakdown
+        )
+    if cache:
+        cache.close()
+    print_batch_summary(results, time.perf_counter() - start)
+    if _profiler is not None:
+        for result in results:
+            if result['write_stats']:
+                _profiler.record_write(result['write_stats'])
+
+    if any(result['status'] not in ('ok', 'unchanged') for result in results):
         sys.exit(1)
+
+def run_backfill(args):
+    """Rebuild the trend history of the plans given on the command line"""
+    test_plan_ids = args.plan_ids if args.plans else [args.test_plan_id]
+    connection = get_db_connection(get_backend(args.backend, args.sqlite_path))
+    try:
+        if args.synthetic:
+            load_synthetic_plans(connection, test_plan_ids)
+        if args.ensure_index:
+            ensure_trend_unique_key(connection)
+            ensure_feature_scope_index(connection)
+        if args.materialize:
+            create_feature_tag_table(connection)
+        tag_lookup = refresh_feature_tags(connection, test_plan_ids)
+        written = backfill_test_run_trends(
+            connection, test_plan_ids, args.backfill_from, args.backfill_to, tag_lookup
+        )
+    finally:
+        connection.close()
+    if written is None:
+        sys.exit(1)
+
+def main():
+    """Main function"""
+    args = parse_arguments()
+    if args.profile:
+        start_profiling()
+    if args.squad_registry:
+        set_squad_registry(args.squad_registry)
+
+    try:
+        if args.benchmark:
+            run_benchmark(args)
+        elif args.backfill_from:
+            run_backfill(args)
+        elif args.plans:
+            run_batch(args)
+        elif args.output == '-':
+            # Keep progress messages out of the report written to stdout
+            report_stream = sys.stdout.buffer
+            with redirect_stdout(sys.stderr):
+                run_single(args, report_stream)
+        else:
+            run_single(args)
+    finally:
+        # Also written when a run fails and exits, which is when it is needed most
+        if args.profile:
+            write_profile(_profiler, args.profile, args.profile_file, to_stderr=args.output == '-')
+
+def write_profile(profiler, fmt, path=None, to_stderr=False):
+    """Write the run's profile to a file, or print it next to the progress messages"""
+    output = profiler.format(fmt)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Profile written to: {path}", file=sys.stderr if to_stderr else sys.stdout)
+    else:
+        print(output, file=sys.stderr if to_stderr else sys.stdout)
+
+def get_report_cache(args):
+    """Open the aggregate cache selected on the command line, or None"""
+    if not args.cache:
+        return None
+    return ReportCache(args.cache, args.cache_size * 1024 * 1024)
+
+def run_single(args, report_stream=None):
+    """Generate the report for the single test plan given on the command line"""
+    test_plan_id = args.test_plan_id
     
     print(f"Generating report for test plan ID: {test_plan_id}")
+    cache = get_report_cache(args)
+
+    if args.from_cache:
+        # Re-render from cached aggregates without touching the database
+        report_data = cache.get_latest(test_plan_id, args.latest_strategy, args.scope)
+        cache.close()
+        if report_data is None:
+            print(f"No cached aggregates for test plan ID: {test_plan_id}")
+            sys.exit(1)
+        print(f"Rendering cached aggregates from {args.cache}")
+        write_single_report(args, test_plan_id, report_data, report_stream)
+        return
     
     # Connect to database
-    connection = get_db_connection()
+    with profile_stage('connect'):
+        connection = get_db_connection(get_backend(args.backend, args.sqlite_path))
     
     try:
-        # Fetch all required data
-        print("Fetching overall summary...")
-        overall_summary = get_overall_summary(connection, test_plan_id)
-        
+        if args.synthetic:
+            load_synthetic_plans(connection, [test_plan_id])
+
+        with profile_stage('prepare'):
+            if args.ensure_index:
+                ensure_latest_run_index(connection)
+                ensure_trend_unique_key(connection)
+                ensure_feature_scope_index(connection)
+
+            if args.materialize:
+                create_latest_run_tables(connection)
+                create_feature_tag_table(connection)
+
+        # Skip the rebuild when no runs have arrived since the last report;
+        # the fingerprint is only taken when the skip check, the cache or the
+        # incremental state reads it
+        filename = args.output or get_report_filename(scope=args.scope)
+        data_fingerprint = None
+        if not (args.force or report_stream) or cache or args.incremental:
+            with profile_stage('fingerprint'):
+                data_fingerprint = get_data_fingerprints(connection, [test_plan_id]).get(test_plan_id)
+        fingerprint = None
+        if data_fingerprint and not report_stream:
+            fingerprint = {
+                'test_plan_id': test_plan_id,
+                'data': data_fingerprint,
+                'render': get_render_signature(
+                    args.assets, get_compression_formats(args.compress), not args.no_plain,
+                    args.trend_runs, args.scope, args.breakdown
+                )
+            }
+            if not args.force and is_report_current(filename, fingerprint):
+                print(f"No runs added or changed since the last report, skipping: {filename}")
+                return
+
+        strategy = args.latest_strategy
+        report_data = None
+        if cache and data_fingerprint:
+            with profile_stage('cache'):
+                report_data = cache.get(test_plan_id, data_fingerprint, strategy, args.scope)
+            if report_data is not None:
+                print("Using cached aggregates, no new runs since they were computed")
+
+        if report_data is None:
+            # Bring the materialized latest runs up to date before reading them
+            with profile_stage('prepare'):
+                tag_lookup = False
+                if get_report_scope(args.scope)['tags'] is not None:
+                    tag_lookup = refresh_feature_tags(connection, [test_plan_id])
+                if strategy == 'materialized':
+                    refresh_latest_run_table(connection, test_plan_id, tag_lookup)
+
+            # Fetch the latest run snapshot once and build every section from it
+            print("Fetching latest run snapshot...")
+            with profile_stage('fetch'):
+                if args.incremental:
+                    report_data = get_incremental_report_data(
+                        connection, test_plan_id, args.incremental, strategy, data_fingerprint, tag_lookup
+                    )
+                else:
+                    report_data = get_streamed_report_data(
+                        connection, [test_plan_id], strategy, args.scope, tag_lookup
+                    )[test_plan_id]
+            if cache and data_fingerprint and report_data['overall_summary']:
+                with profile_stage('cache'):
+                    cache.put(test_plan_id, data_fingerprint, strategy, args.scope, report_data)
+        overall_summary = report_data['overall_summary']
+
         if not overall_summary:
             print(f"No test data found for test plan ID: {test_plan_id}")
             sys.exit(1)
-        
-        print("Fetching squad summary...")
-        squad_summary = get_squad_summary(connection, test_plan_id)
-        
-        print("Fetching feature summary...")
-        feature_summary = get_feature_summary(connection, test_plan_id)
-        
-        print("Fetching feature breakdown...")
-        feature_breakdown = get_feature_breakdown(connection, test_plan_id)
-        
-        print("Fetching EPIC summary...")
-        epic_summary = get_epic_summary(connection, test_plan_id)
-        
-        # Save test run trend
-        print("Saving test run trend...")
-        save_test_run_trend(connection, test_plan_id, overall_summary)
-        
-        # Generate HTML report
-        print("Generating HTML report...")
-        html_content = generate_html_report(
-            test_plan_id, 
-            overall_summary, 
-            squad_summary, 
-            feature_summary, 
-            feature_breakdown,
-            epic_summary
-        )
-        
-        # Write to file
-        filename = f"{datetime.now().strftime('%Y%m%d')}_1p_report.html"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # Print summary
-        total_tests = sum(item['count'] for item in overall_summary)
-        passed = next((item['count'] for item in overall_summary if item['test_case_status'] == 'passed'), 0)
-        pass_rate = round((passed / total_tests * 100), 1) if total_tests > 0 else 0
-        
-        print(f"\n{'='*50}")
-        print(f"Report generated successfully: {filename}")
-        print(f"{'='*50}")
-        print(f"Test Plan ID: {test_plan_id}")
-        print(f"Total Test Cases: {total_tests}")
-        print(f"Pass Rate: {pass_rate}%")
-        print(f"{'='*50}\n")
+
+        trend_history = None
+        if get_report_scope(args.scope)['trend']:
+            # Save test run trend
+            print("Saving test run trend...")
+            with profile_stage('save_trend'):
+                save_test_run_trend(connection, test_plan_id, overall_summary)
+
+            if args.trend_runs:
+                with profile_stage('trend'):
+                    trend_history = get_trend_history(connection, [test_plan_id], args.trend_runs - 1)[test_plan_id]
+
+        write_single_report(args, test_plan_id, report_data, report_stream, fingerprint, trend_history)
         
     except Exception as e:
         print(f"Error generating report: {e}")
@@ -1529,6 +5230,71 @@ def main():
         sys.exit(1)
     finally:
         connection.close()
+        if cache:
+            cache.close()
+
+def write_single_report(args, test_plan_id, report_data, report_stream=None, fingerprint=None,
+                        trend_history=None):
+    """Render a single plan's report to its destination and print its summary"""
+    overall_summary = report_data['overall_summary']
+    filename = args.output or get_report_filename(scope=args.scope)
+
+    # Stream the HTML report to its destination section by section
+    print("Generating HTML report...")
+    assets = None
+    if args.assets == 'external':
+        asset_directory = '.' if report_stream else os.path.dirname(filename) or '.'
+        assets = write_report_assets(asset_directory)
+        print(f"Using shared assets: {assets['css']}, {assets['js']}")
+    breakdown_source = get_breakdown_source(args.breakdown, report_data['feature_breakdown'], filename)
+    chunks = iter_html_report(
+        test_plan_id, assets=assets, trend_history=trend_history, scope=args.scope,
+        breakdown_source=breakdown_source, **report_data
+    )
+    if _profiler is not None:
+        chunks = _profiler.iter_sections(chunks)
+    with profile_stage('render_and_write'):
+        write_stats = write_report(
+            chunks,
+            filename,
+            report_stream,
+            compression=get_compression_formats(args.compress),
+            keep_plain=not args.no_plain
+        )
+    if _profiler is not None:
+        _profiler.record_write(write_stats)
+    
+    # Print summary
+    totals = get_status_totals(overall_summary)
+    total_tests, passed = totals['total_tests'], totals['passed']
+    pass_rate = round((passed / total_tests * 100), 1) if total_tests > 0 else 0
+
+    if fingerprint:
+        save_report_fingerprint(
+            filename, fingerprint, write_stats, not args.no_plain,
+            {'total_tests': total_tests, 'pass_rate': pass_rate},
+            get_linked_files(filename, assets, args.breakdown)
+        )
+    elif not report_stream:
+        # A fingerprint left from an earlier build would let the next run
+        # skip over this report, which may differ from it (no trend section
+        # when rendered from the cache)
+        remove_report_fingerprint(filename)
+    
+    if report_stream:
+        destination = '<stdout>'
+    elif args.no_plain:
+        destination = ', '.join(output['path'] for output in write_stats['compressed'])
+    else:
+        destination = filename
+    print(f"\n{'='*50}")
+    print(f"Report generated successfully: {destination}")
+    print(f"{'='*50}")
+    print(f"Test Plan ID: {test_plan_id}")
+    print(f"Total Test Cases: {total_tests}")
+    print(f"Pass Rate: {pass_rate}%")
+    print_write_stats(write_stats)
+    print(f"{'='*50}\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
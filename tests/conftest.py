@@ -0,0 +1,66 @@
+"""Shared fixtures: the report generator module and synthetic SQLite databases"""
+import importlib.util
+import os
+
+import pytest
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '1p_report_generator.py')
+
+# Plans loaded into every synthetic database
+PLAN_IDS = [1, 2]
+
+def load_report_generator():
+    """Load the generator script, whose name starts with a digit and cannot be imported"""
+    spec = importlib.util.spec_from_file_location('report_generator', MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope='session')
+def rg():
+    return load_report_generator()
+
+@pytest.fixture
+def connection(rg, tmp_path):
+    """A SQLite database holding synthetic runs for PLAN_IDS"""
+    connection = rg.SQLiteBackend(str(tmp_path / 'cx_dashboard.db')).connect()
+    rg.load_synthetic_data(connection, PLAN_IDS, cases_per_plan=120, runs_per_case=3, seed=7)
+    yield connection
+    connection.close()
+
+@pytest.fixture
+def insert_runs(rg):
+    """Insert (test_plan_id, test_case_key, owner, feature, test_case_status, created_at) runs"""
+    def insert(connection, runs):
+        rg.execute_statement(
+            connection,
+            """
+            INSERT INTO tc_test_run
+                (test_plan_id, test_case_key, owner, feature, test_case_status, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            runs,
+            many=True
+        )
+        connection.commit()
+    return insert
+
+@pytest.fixture
+def execute(rg):
+    """Run a statement and commit it"""
+    def run(connection, query, params=None):
+        rg.execute_statement(connection, query, params)
+        connection.commit()
+    return run
+
+def normalize(report_data):
+    """Order every result set, since rows with equal values may come in any order"""
+    return {name: sorted(rows, key=repr) for name, rows in report_data.items()}
+
+@pytest.fixture
+def full_snapshot(rg):
+    """Get a plan's report data from the row_number snapshot, the reference every other path must match"""
+    def get(connection, test_plan_id, scope=None):
+        scope = scope or rg.DEFAULT_REPORT_SCOPE
+        return normalize(rg.get_streamed_report_data(connection, [test_plan_id], 'row_number', scope)[test_plan_id])
+    return get
@@ -0,0 +1,58 @@
+import pytest
+
+from conftest import normalize
+
+# Runs whose features carry other tags, several tags or a lower-case tag
+TAGGED_RUNS = [
+    (1, 'TC-1', 'A-Team', 'Checkout [3P]', 'failed', '2026-01-01 10:00:00'),
+    (1, 'TC-2', 'Pirates', 'Wallet [Mobile] [1P]', 'passed', '2026-01-01 10:00:00'),
+    (1, 'TC-3', 'Pirates', 'Search [1p]', 'blocked', '2026-01-01 10:00:00'),
+    (1, 'TC-4', 'Mavericks', 'Payments [mobile]', 'passed', '2026-01-01 10:00:00'),
+]
+
+
+@pytest.fixture
+def tag_lookup(rg, connection):
+    """Refresh tc_feature_tag for plan 1 and get its report data through the lookup"""
+    assert rg.create_feature_tag_table(connection)
+
+    def get(scope):
+        assert rg.refresh_feature_tags(connection, [1])
+        return normalize(rg.get_streamed_report_data(connection, [1], 'row_number', scope, tag_lookup=True)[1])
+    return get
+
+
+@pytest.mark.parametrize('scope', ['1p', '3P', 'MOBILE', '1P,MOBILE'])
+def test_lookup_matches_like(connection, tag_lookup, full_snapshot, insert_runs, scope):
+    insert_runs(connection, TAGGED_RUNS)
+    assert tag_lookup(scope) == full_snapshot(connection, 1, scope)
+
+
+def test_renamed_features_are_retagged(connection, tag_lookup, full_snapshot, execute):
+    tag_lookup('1p')
+    # One feature loses its tag and another gains it, in place
+    execute(connection, "UPDATE tc_test_run SET feature = 'Feature 1' WHERE feature = 'Feature 1 [1P]'")
+    execute(connection, "UPDATE tc_test_run SET feature = 'Feature 10 [1P]' WHERE feature = 'Feature 10'")
+    assert tag_lookup('1p') == full_snapshot(connection, 1)
+
+
+def test_new_and_deleted_runs_are_retagged(connection, tag_lookup, full_snapshot, insert_runs, execute):
+    tag_lookup('1p')
+    insert_runs(connection, TAGGED_RUNS)
+    execute(connection, "DELETE FROM tc_test_run WHERE feature = 'Feature 2 [1P]'")
+    assert tag_lookup('1p') == full_snapshot(connection, 1)
+    assert tag_lookup('MOBILE') == full_snapshot(connection, 1, 'MOBILE')
+
+
+def test_tags_with_like_wildcards(connection, tag_lookup, full_snapshot, insert_runs):
+    insert_runs(connection, [
+        (1, 'TC-1', 'A-Team', 'Checkout [A_B]', 'failed', '2026-01-01 10:00:00'),
+        (1, 'TC-2', 'A-Team', 'Wallet [AxB]', 'passed', '2026-01-01 10:00:00'),
+    ])
+    report_data = tag_lookup('A_B')
+    assert report_data == full_snapshot(connection, 1, 'A_B')
+    assert [(row.test_case_status, row.count) for row in report_data['overall_summary']] == [('failed', 1)]
+
+
+def test_refresh_without_table_falls_back_to_like(rg, connection):
+    assert rg.refresh_feature_tags(connection, [1]) is False
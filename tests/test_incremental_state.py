@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from conftest import normalize
+
+
+@pytest.fixture
+def incremental(rg, tmp_path, capsys):
+    """Get plan 1's report data from its saved state, and whether the state was folded or rebuilt"""
+    state_dir = str(tmp_path / 'state')
+
+    def get(connection, strategy='row_number'):
+        capsys.readouterr()
+        report_data = rg.get_incremental_report_data(connection, 1, state_dir, strategy)
+        output = capsys.readouterr().out
+        return normalize(report_data), 'rebuilt' if 'from a full snapshot' in output else 'folded'
+    get.state_dir = state_dir
+    return get
+
+
+def test_first_run_builds_the_state(connection, incremental, full_snapshot):
+    assert incremental(connection) == (full_snapshot(connection, 1), 'rebuilt')
+    assert incremental(connection) == (full_snapshot(connection, 1), 'folded')
+
+
+def test_new_runs_are_folded(connection, incremental, full_snapshot, insert_runs):
+    incremental(connection)
+    insert_runs(connection, [
+        # Replaces a stored run, moving the case to another squad, feature and status
+        (1, 'TC-1', 'Pirates', 'Feature 3 [1P]', 'blocked', '2026-01-01 10:00:00'),
+        # A new test case
+        (1, 'TC-500', 'A-Team', 'Feature 1 [1P]', 'passed', '2026-01-01 11:00:00'),
+        # Older than the stored run of its case, so it must not replace it
+        (1, 'TC-2', 'A-Team', 'Feature 1 [1P]', 'failed', '2024-01-01 09:00:00'),
+        # Outside the 1P scope
+        (1, 'TC-3', 'A-Team', 'Feature 10', 'failed', '2026-01-01 12:00:00'),
+        # Another plan
+        (2, 'TC-4', 'A-Team', 'Feature 1 [1P]', 'failed', '2026-01-01 12:00:00'),
+    ])
+    assert incremental(connection) == (full_snapshot(connection, 1), 'folded')
+
+    # A case replaced twice within one fold keeps only its newest run
+    insert_runs(connection, [
+        (1, 'TC-1', 'A-Team', 'Feature 2 [1P]', 'failed', '2026-01-03 10:00:00'),
+        (1, 'TC-1', 'Mavericks', 'Feature 2 [1P]', 'passed', '2026-01-02 10:00:00'),
+    ])
+    assert incremental(connection) == (full_snapshot(connection, 1), 'folded')
+
+
+def test_deleted_runs_rebuild_the_state(connection, incremental, full_snapshot, insert_runs, execute):
+    incremental(connection)
+    # The case's previous run becomes its latest again
+    execute(
+        connection,
+        "DELETE FROM tc_test_run WHERE id = "
+        "(SELECT MAX(id) FROM tc_test_run WHERE test_plan_id = 1 AND test_case_key = 'TC-5')"
+    )
+    insert_runs(connection, [(1, 'TC-6', 'A-Team', 'Feature 1 [1P]', 'failed', '2026-01-01 10:00:00')])
+    assert incremental(connection) == (full_snapshot(connection, 1), 'rebuilt')
+
+
+def test_updated_runs_are_read_when_the_state_is_rebuilt(connection, incremental, full_snapshot, execute):
+    # Runs updated in place do not change the fingerprint; the next rebuild reads them
+    incremental(connection)
+    execute(connection, "UPDATE tc_test_run SET test_case_status = 'blocked' WHERE test_plan_id = 1")
+    execute(connection, "DELETE FROM tc_test_run WHERE id = (SELECT MIN(id) FROM tc_test_run WHERE test_plan_id = 1)")
+    assert incremental(connection) == (full_snapshot(connection, 1), 'rebuilt')
+
+
+def test_updated_epic_links_rebuild_the_state(connection, incremental, full_snapshot, execute):
+    incremental(connection)
+    execute(connection, "UPDATE tc_case_epic SET epic_title = 'Renamed EPIC' WHERE epic_id = 'EPIC-1'")
+    assert incremental(connection) == (full_snapshot(connection, 1), 'rebuilt')
+    execute(connection, "DELETE FROM tc_case_epic WHERE test_case_id = 'TC-7'")
+    assert incremental(connection) == (full_snapshot(connection, 1), 'rebuilt')
+
+
+def test_another_strategy_rebuilds_the_state(rg, connection, incremental, insert_runs):
+    incremental(connection)
+    # A late run with a higher id but an older timestamp: only max_id takes it
+    insert_runs(connection, [(1, 'TC-8', 'A-Team', 'Feature 1 [1P]', 'failed', '2000-01-01 09:00:00')])
+    expected = normalize(rg.get_streamed_report_data(connection, [1], 'max_id')[1])
+    assert incremental(connection, 'max_id') == (expected, 'rebuilt')
+
+
+def test_failed_read_saves_no_state(rg, connection, incremental, monkeypatch):
+    def fail(self, size):
+        raise RuntimeError("Lost connection to MySQL server during query")
+    monkeypatch.setattr(rg.SQLiteCursor, 'fetchmany', fail)
+    with pytest.raises(RuntimeError):
+        incremental(connection)
+    assert not os.path.exists(rg.get_aggregation_state_path(incremental.state_dir, 1))
@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import PLAN_IDS, normalize
+
+
+@pytest.fixture
+def materialized(rg, connection):
+    """Refresh tc_latest_1p_run for a plan and get its report data from it"""
+    assert rg.create_latest_run_tables(connection)
+
+    def get(test_plan_id=1, tag_lookup=False):
+        rg.refresh_latest_run_table(connection, test_plan_id, tag_lookup)
+        return normalize(rg.get_streamed_report_data(connection, [test_plan_id], 'materialized')[test_plan_id])
+    return get
+
+
+def test_refresh_matches_the_full_snapshot(connection, materialized, full_snapshot):
+    for test_plan_id in PLAN_IDS:
+        assert materialized(test_plan_id) == full_snapshot(connection, test_plan_id)
+
+
+def test_new_runs_are_upserted(rg, connection, materialized, full_snapshot, insert_runs):
+    materialized()
+    insert_runs(connection, [
+        # Replaces a stored run
+        (1, 'TC-1', 'Pirates', 'Feature 3 [1P]', 'blocked', '2026-01-01 10:00:00'),
+        # A new test case
+        (1, 'TC-500', 'A-Team', 'Feature 1 [1P]', 'passed', '2026-01-01 11:00:00'),
+        # Older than the stored run of its case, so it must not replace it
+        (1, 'TC-2', 'A-Team', 'Feature 1 [1P]', 'failed', '2024-01-01 09:00:00'),
+        # The case's latest run leaves the 1P scope; its latest 1P run still counts
+        (1, 'TC-3', 'A-Team', 'Feature 10', 'failed', '2026-01-01 12:00:00'),
+        # Several new runs of one case: the newest wins
+        (1, 'TC-4', 'A-Team', 'Feature 2 [1P]', 'failed', '2026-01-03 10:00:00'),
+        (1, 'TC-4', 'Mavericks', 'Feature 2 [1P]', 'passed', '2026-01-02 10:00:00'),
+        # Another plan
+        (2, 'TC-5', 'A-Team', 'Feature 1 [1P]', 'failed', '2026-01-01 12:00:00'),
+    ])
+    assert materialized() == full_snapshot(connection, 1)
+    assert materialized(2) == full_snapshot(connection, 2)
+
+    # A run tied on created_at is newer by id
+    insert_runs(connection, [(1, 'TC-4', 'Spartans', 'Feature 2 [1P]', 'not_implemented', '2026-01-03 10:00:00')])
+    assert materialized() == full_snapshot(connection, 1)
+
+
+def test_refresh_reads_only_new_runs(rg, connection, materialized, insert_runs):
+    materialized()
+    assert rg.refresh_latest_run_table(connection, 1) == 0
+    insert_runs(connection, [(1, 'TC-1', 'Pirates', 'Feature 3 [1P]', 'blocked', '2026-01-01 10:00:00')])
+    assert rg.refresh_latest_run_table(connection, 1) == 1
+    max_run_id = rg.execute_query(connection, "SELECT MAX(id) as max_run_id FROM tc_test_run")[0]['max_run_id']
+    assert rg.get_latest_run_watermark(connection, 1) == max_run_id
+
+
+def test_refresh_with_feature_tags(rg, connection, materialized, full_snapshot, insert_runs):
+    assert rg.create_feature_tag_table(connection)
+    insert_runs(connection, [(1, 'TC-1', 'Pirates', 'Feature 3 [1P]', 'blocked', '2026-01-01 10:00:00')])
+    assert rg.refresh_feature_tags(connection, [1])
+    assert materialized(tag_lookup=True) == full_snapshot(connection, 1)
+
+
+def test_materialized_runs_cover_only_the_1p_scope(rg):
+    with pytest.raises(ValueError):
+        rg.get_latest_runs_cte(1, 'materialized', ('3P',))
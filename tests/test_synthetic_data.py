@@ -0,0 +1,29 @@
+from conftest import PLAN_IDS, normalize
+
+
+def test_synthetic_data_is_reproducible(rg, tmp_path):
+    rows = []
+    for name in ('a.db', 'b.db'):
+        connection = rg.SQLiteBackend(str(tmp_path / name)).connect()
+        inserted = rg.load_synthetic_data(connection, PLAN_IDS, cases_per_plan=50, runs_per_case=2, seed=3)
+        rows.append(rg.execute_query(connection, "SELECT * FROM tc_test_run ORDER BY id"))
+        connection.close()
+    assert inserted == len(PLAN_IDS) * 50 * 2
+    assert len(rows[0]) == inserted
+    assert rows[0] == rows[1]
+
+
+def test_synthetic_data_replaces_the_plans_runs(rg, connection):
+    rg.load_synthetic_data(connection, [1], cases_per_plan=10, runs_per_case=1)
+    counts = rg.execute_query(
+        connection, "SELECT test_plan_id, COUNT(*) as runs FROM tc_test_run GROUP BY test_plan_id ORDER BY test_plan_id"
+    )
+    assert [(row['test_plan_id'], row['runs']) for row in counts] == [(1, 10), (2, 360)]
+
+
+def test_strategies_agree_on_synthetic_runs(rg, connection, full_snapshot):
+    # Synthetic runs are inserted in time order and never tie, so every strategy picks the same run
+    for strategy in ('max_id', 'max_created_at'):
+        for test_plan_id in PLAN_IDS:
+            report_data = rg.get_streamed_report_data(connection, [test_plan_id], strategy)[test_plan_id]
+            assert normalize(report_data) == full_snapshot(connection, test_plan_id)
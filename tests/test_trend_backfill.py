@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+import pytest
+
+from conftest import PLAN_IDS
+
+# Synthetic runs fall on 2025-01-01 to 2025-01-04; the range starts before
+# them and ends after them
+START_DATE = date(2024, 12, 31)
+END_DATE = date(2025, 1, 6)
+
+
+def get_trend_rows(rg, connection):
+    """Get the saved trend counts keyed by plan and day"""
+    rows = rg.execute_query(connection, f"SELECT {', '.join(rg.TrendRow._fields)} FROM test_run_trend")
+    return {
+        (row['test_plan_id'], str(row['run_date'])): {status: row[status] for status in rg.STATUS_COLUMNS}
+        for row in rows
+    }
+
+
+def get_snapshot_counts(rg, report_data):
+    """Get the status counts of a report, as its trend row would hold them"""
+    counts = dict.fromkeys(rg.STATUS_COLUMNS, 0)
+    for row in report_data['overall_summary']:
+        if row.test_case_status in counts:
+            counts[row.test_case_status] += row.count
+    return counts
+
+
+def assert_matches_daily_snapshots(rg, connection, full_snapshot, trend_rows):
+    """Check every day's trend row against the row_number snapshot of the runs made by the end of it
+
+    Days are checked from the last one back, deleting the runs made after
+    each day before taking its snapshot.
+    """
+    day = END_DATE
+    while day >= START_DATE:
+        rg.execute_statement(connection, "DELETE FROM tc_test_run WHERE created_at >= %s",
+                             ((day + timedelta(days=1)).isoformat(),))
+        for test_plan_id in PLAN_IDS:
+            report_data = full_snapshot(connection, test_plan_id)
+            if report_data['overall_summary']:
+                assert trend_rows.pop((test_plan_id, day.isoformat())) == get_snapshot_counts(rg, report_data)
+        day -= timedelta(days=1)
+    # No rows for days before a plan's first run
+    assert trend_rows == {}
+
+
+@pytest.fixture
+def changed_runs(connection, insert_runs, execute):
+    """Update, delete and add runs out of id order before the backfill"""
+    execute(connection, "UPDATE tc_test_run SET test_case_status = 'blocked' WHERE test_case_key = 'TC-1'")
+    execute(connection, "DELETE FROM tc_test_run WHERE test_case_key = 'TC-2' AND created_at >= '2025-01-02'")
+    insert_runs(connection, [
+        # A late run with a higher id but an older timestamp than the case's other runs
+        (1, 'TC-3', 'A-Team', 'Feature 1 [1P]', 'not_implemented', '2024-12-31 09:00:00'),
+        (2, 'TC-3', 'A-Team', 'Feature 1 [1P]', 'application_bug', '2025-01-03 23:59:59'),
+        # Outside the 1P scope
+        (1, 'TC-4', 'A-Team', 'Feature 10', 'failed', '2025-01-05 10:00:00'),
+    ])
+    return connection
+
+
+def test_backfill_matches_daily_snapshots(rg, changed_runs, full_snapshot):
+    connection = changed_runs
+    written = rg.backfill_test_run_trends(connection, PLAN_IDS, START_DATE, END_DATE)
+    trend_rows = get_trend_rows(rg, connection)
+    assert written == len(trend_rows) > 0
+    assert_matches_daily_snapshots(rg, connection, full_snapshot, trend_rows)
+
+
+def test_backfill_without_unique_key_updates_rows(rg, changed_runs, full_snapshot):
+    connection = changed_runs
+    rg.execute_statement(connection, f"DROP INDEX {rg.TREND_UNIQUE_KEY_NAME}")
+    first = rg.backfill_test_run_trends(connection, PLAN_IDS, START_DATE, END_DATE)
+    assert rg.backfill_test_run_trends(connection, PLAN_IDS, START_DATE, END_DATE) == first
+    trend_rows = get_trend_rows(rg, connection)
+    count = rg.execute_query(connection, "SELECT COUNT(*) as count FROM test_run_trend")[0]['count']
+    assert count == len(trend_rows) == first
+    assert_matches_daily_snapshots(rg, connection, full_snapshot, trend_rows)